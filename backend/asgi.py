@@ -0,0 +1,298 @@
+"""
+ASGI entry point, used when the container runs with SERVING_MODE=asgi:
+
+    uvicorn backend.asgi:app --host 0.0.0.0 --port 8080
+
+The search, practice, answer and words endpoints are coroutines that await the
+async Firestore client and the async Gemini client, so a slow Gemini lookup no
+longer holds one of a handful of worker threads. All other routes (static files,
+batch endpoints, deletes, ...) are served by the Flask app in main.py, which
+also owns the shared in-process state (cache, view flusher, practice index).
+"""
+
+import os
+import sys
+import time
+import asyncio
+import functools
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import main
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from async_word_store import AsyncFirestoreWordStore, ThreadedAsyncWordStore
+from metrics import InstrumentedAsyncWordStore, current_route
+from startup import LazyClient
+from singleflight import AsyncSingleFlight
+from gemini_resilience import GeminiUnavailableError
+
+
+def create_async_store():
+    """Async view of the configured word store."""
+    if not main.store:
+        return None
+    if main.WORD_STORE_BACKEND != 'sqlite':
+        if not main.get_db():
+            return None
+        from google.cloud import firestore
+        credentials = main.firestore_credentials
+        client = firestore.AsyncClient(database='vocabulary', credentials=credentials,
+                                       project=credentials.project_id if credentials else None)
+        return InstrumentedAsyncWordStore(AsyncFirestoreWordStore(client, on_write=main.store.mark_changed),
+                                          main.store_operations)
+    # SQLite lookups take well under a millisecond; run them in the thread pool
+    # (main.store.inner already counts operations for /metrics)
+    return ThreadedAsyncWordStore(main.store.inner, on_write=main.store.mark_changed)
+
+
+# Created on first use, like the clients in main.py
+async_store_client = LazyClient('Async word store', create_async_store, main.startup_timer)
+async_word_lookups = AsyncSingleFlight()
+
+
+class FlaskJSONResponse(JSONResponse):
+    """JSON response encoded like Flask's jsonify (handles datetimes the same way)."""
+
+    def render(self, content):
+        return main.app.json.dumps(content).encode('utf-8')
+
+
+def timed(route):
+    """Record the handler's latency in main.request_latency, like the Flask middleware does."""
+    def decorate(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            started = time.perf_counter()
+            main.startup_timer.request_received()
+            current_route.set(route)
+            response = await handler(request)
+            main.request_latency.observe(time.perf_counter() - started, method=request.method,
+                                         route=route, status=response.status_code)
+            return response
+        return wrapper
+    return decorate
+
+
+def error_response(message, status_code):
+    return JSONResponse({"error": message}, status_code=status_code)
+
+
+def error_tuple_response(error):
+    """JSON response for a main.py (body, status, headers) error."""
+    body, status_code, headers = error
+    return JSONResponse(body, status_code=status_code, headers=headers)
+
+
+async def get_word_data_with_gemini_async(word):
+    """Async version of main.get_word_data_with_gemini, using the async Gemini client."""
+    # The LLM response cache is a local SQLite file: read and write it off the event loop
+    word_data = await asyncio.to_thread(main.word_data_without_gemini, word)
+    if word_data is not None:
+        return word_data
+    try:
+        response = await main.get_gemini_client().aio.models.generate_content(
+            model=main.gemini_model,
+            contents=main.build_word_prompt(word)
+        )
+        return await asyncio.to_thread(main.word_data_from_response, word, response)
+    except Exception as e:
+        return main.word_lookup_failed(word, e)
+
+
+async def find_corrected_word(word_id):
+    """Async version of main.find_corrected_word."""
+    # The first lookup may have to wait for the suggest index to be built
+    corrected_id = await asyncio.to_thread(main.corrected_word_id, word_id)
+    if corrected_id is None:
+        return None, None
+    word_data = main.word_cache.get(corrected_id)
+    if word_data is None:
+        word_data = main.with_pending_views(corrected_id, await async_store_client.get().get(corrected_id))
+        if word_data is None:
+            return None, None
+    return corrected_id, word_data
+
+
+async def create_word(word_id, english_word):
+    """Async version of main.create_word."""
+    async_store = async_store_client.get()
+    existing = await async_store.get(word_id)
+    if existing is not None:
+        return existing, False
+    new_word_data = main.build_word_document(english_word, await get_word_data_with_gemini_async(english_word))
+    await async_store.set(word_id, new_word_data)
+    main.index_new_word(word_id, new_word_data)
+    return main.response_copy(new_word_data), True
+
+
+@timed('/api/search')
+async def search_word(request):
+    async_store = async_store_client.get()
+    if not async_store:
+        return error_response("Word store not initialized", 500)
+    try:
+        data = await request.json()
+        english_word = data.get('word', '').strip()
+
+        if not english_word:
+            return error_response("Word not provided", 400)
+
+        word_id = english_word.lower()
+        word_data = main.word_cache.get(word_id)
+        if word_data is None:
+            word_data = main.with_pending_views(word_id, await async_store.get(word_id))
+
+        corrected_from = None
+        if word_data is None and not data.get('exact'):
+            # Probably a misspelling of a stored word: show that instead of paying for a new lookup
+            corrected_id, word_data = await find_corrected_word(word_id)
+            if word_data is not None:
+                corrected_from, word_id = english_word, corrected_id
+
+        if word_data is None:
+            refusal = await asyncio.to_thread(main.new_word_refusal, english_word)
+            if refusal is not None:
+                return error_tuple_response(refusal)
+
+            # Concurrent requests for the same unseen word share a single Gemini call and write
+            (word_data, created), shared = await async_word_lookups.do(word_id, lambda: create_word(word_id, english_word))
+            if created and not shared:
+                return FlaskJSONResponse(word_data, status_code=201)
+            word_data = dict(word_data)
+
+        if corrected_from is not None:
+            # A "did you mean" answer: the user did not ask for this word, so no view is counted
+            return FlaskJSONResponse(dict(word_data, corrected_from=corrected_from), status_code=200)
+
+        # Word already exists in the database
+        written_behind = main.view_flusher.running
+        if not written_behind:
+            await async_store.increment(word_id, {"view_count": 1}, {"last_viewed_at": main.SERVER_TIMESTAMP})
+        return FlaskJSONResponse(main.count_search_view(word_id, word_data, record=written_behind), status_code=200)
+    except GeminiUnavailableError as e:
+        print(f"Gemini unavailable in /api/search: {e}")
+        return error_tuple_response(main.gemini_unavailable_error())
+    except Exception as e:
+        print(f"Error in /api/search: {e}")
+        return error_response(f"An internal error occurred: {str(e)}", 500)
+
+
+@timed('/api/practice')
+async def get_practice_word(request):
+    async_store = async_store_client.get()
+    if not async_store:
+        return error_response("Word store not initialized", 500)
+    try:
+        main.practice_queue.start()
+        question = main.practice_queue.pop()
+        if question is None:
+            # Queue empty (e.g. right after startup): build one without blocking the event loop
+            question = await asyncio.to_thread(main.build_practice_question)
+        if question is None:
+            return error_response("No suitable words for practice", 404)
+        return FlaskJSONResponse(question, status_code=200)
+    except Exception as e:
+        print(f"Error in /api/practice: {e}")
+        return error_response("An internal error occurred", 500)
+
+
+@timed('/api/answer')
+async def submit_answer(request):
+    async_store = async_store_client.get()
+    if not async_store:
+        return error_response("Word store not initialized", 500)
+    try:
+        data = await request.json()
+        english_word = data.get('word', '').strip().lower()
+        is_correct = data.get('is_correct')
+
+        if not english_word or is_correct is None:
+            return error_response("Word or correctness not provided", 400)
+
+        current_data = await async_store.get(english_word)
+        if current_data is None:
+            return error_response("Word not found", 404)
+
+        counters, update_fields = main.practice_answer_update(current_data, is_correct)
+        await async_store.increment(english_word, counters, update_fields)
+        main.answer_recorded(english_word, current_data, update_fields)
+
+        return JSONResponse({"message": "Practice stats updated"}, status_code=200)
+    except Exception as e:
+        print(f"Error in /api/answer: {e}")
+        return error_response("An internal error occurred", 500)
+
+
+async def stream_json_array(words):
+    yield "["
+    index = 0
+    async for _, doc in words:
+        yield ("," if index else "") + main.app.json.dumps(doc)
+        index += 1
+    yield "]"
+
+
+@timed('/api/words')
+async def get_words(request):
+    """Async version of main.get_words (same query parameters, ETag and X-Next-Cursor)."""
+    async_store = async_store_client.get()
+    if not async_store:
+        return error_response("Word store not initialized", 500)
+    try:
+        limit, start_after, fields = main.words_query(request.query_params)
+
+        etag = f'"{main.words_etag(limit, start_after, fields)}"'
+        headers = {'Cache-Control': 'no-cache', 'ETag': etag}
+        if etag in [tag.strip() for tag in request.headers.get('if-none-match', '').split(',')]:
+            return Response(status_code=304, headers=headers)
+
+        words = await async_store.iter_words(order_by='created_at', descending=True,
+                                             limit=limit, start_after=start_after, fields=fields)
+        if limit:
+            # A page is bounded, so read it first to know the next cursor
+            page = [item async for item in words]
+            if len(page) == limit:
+                headers['X-Next-Cursor'] = page[-1][0]
+
+            async def iterate():
+                for item in page:
+                    yield item
+            words = iterate()
+        return StreamingResponse(stream_json_array(words), media_type='application/json', headers=headers)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        print(f"Error in /api/words: {e}")
+        return error_response("An internal error occurred", 500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Warm up the clients in the background (STARTUP_WARMUP=0 disables it), without delaying startup."""
+    main.start_warmup()
+    warmup = None
+    if os.environ.get('STARTUP_WARMUP', '1') != '0':
+        warmup = asyncio.create_task(asyncio.to_thread(async_store_client.get))
+    yield
+    if warmup is not None:
+        warmup.cancel()
+
+
+app = Starlette(
+    lifespan=lifespan,
+    routes=[
+        Route("/api/search", search_word, methods=['POST']),
+        Route("/api/practice", get_practice_word, methods=['GET']),
+        Route("/api/answer", submit_answer, methods=['POST']),
+        Route("/api/words", get_words, methods=['GET']),
+        # Everything else is handled by the Flask app
+        Mount("/", app=WSGIMiddleware(main.app)),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+)
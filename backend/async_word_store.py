@@ -0,0 +1,138 @@
+"""
+Async counterparts of the `WordStore` operations used by the ASGI handlers.
+
+- `AsyncFirestoreWordStore` talks to Firestore through `firestore.AsyncClient`.
+- `ThreadedAsyncWordStore` runs a synchronous `WordStore` (e.g. SQLite) in a
+  worker thread.
+
+`on_write` is called after every write, so the synchronous side can keep track
+of changes (see `ChangeTrackingWordStore`).
+"""
+
+import asyncio
+
+from word_store import SERVER_TIMESTAMP, WordNotFoundError
+
+
+class AsyncWordStore:
+    """Interface for the async operations the ASGI handlers need."""
+
+    def __init__(self, on_write=None):
+        self._on_write = on_write
+
+    def _written(self):
+        if self._on_write:
+            self._on_write()
+
+    async def get(self, word_id):
+        raise NotImplementedError
+
+    async def get_many(self, word_ids):
+        raise NotImplementedError
+
+    async def set(self, word_id, data):
+        raise NotImplementedError
+
+    async def increment(self, word_id, counters, fields=None):
+        raise NotImplementedError
+
+    async def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        """
+        Return an async iterator of (word_id, document); see `WordStore.iter_words`.
+        The cursor is validated before this returns.
+        """
+        raise NotImplementedError
+
+
+class ThreadedAsyncWordStore(AsyncWordStore):
+    """Runs the calls of a synchronous `WordStore` in the default thread pool."""
+
+    def __init__(self, store, on_write=None):
+        super().__init__(on_write)
+        self.store = store
+
+    async def get(self, word_id):
+        return await asyncio.to_thread(self.store.get, word_id)
+
+    async def get_many(self, word_ids):
+        return await asyncio.to_thread(self.store.get_many, word_ids)
+
+    async def set(self, word_id, data):
+        await asyncio.to_thread(self.store.set, word_id, data)
+        self._written()
+
+    async def increment(self, word_id, counters, fields=None):
+        await asyncio.to_thread(self.store.increment, word_id, counters, fields)
+        self._written()
+
+    async def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        words = await asyncio.to_thread(
+            lambda: list(self.store.iter_words(order_by, descending, limit, start_after, fields))
+        )
+
+        async def iterate():
+            for item in words:
+                yield item
+        return iterate()
+
+
+class AsyncFirestoreWordStore(AsyncWordStore):
+    """`AsyncWordStore` backed by a Firestore collection through `firestore.AsyncClient`."""
+
+    def __init__(self, client, collection='words', on_write=None):
+        super().__init__(on_write)
+        from google.cloud import firestore
+        from google.api_core import exceptions
+        self._firestore = firestore
+        self._not_found = exceptions.NotFound
+        self._client = client
+        self._collection = client.collection(collection)
+
+    def _convert(self, data):
+        return {
+            key: self._firestore.SERVER_TIMESTAMP if value is SERVER_TIMESTAMP else value
+            for key, value in data.items()
+        }
+
+    async def get(self, word_id):
+        doc = await self._collection.document(word_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def get_many(self, word_ids):
+        refs = [self._collection.document(word_id) for word_id in word_ids]
+        if not refs:
+            return {}
+        return {doc.id: doc.to_dict() async for doc in self._client.get_all(refs) if doc.exists}
+
+    async def set(self, word_id, data):
+        await self._collection.document(word_id).set(self._convert(data))
+        self._written()
+
+    async def increment(self, word_id, counters, fields=None):
+        update_fields = {key: self._firestore.Increment(amount) for key, amount in counters.items()}
+        update_fields.update(self._convert(fields or {}))
+        try:
+            await self._collection.document(word_id).update(update_fields)
+        except self._not_found as e:
+            raise WordNotFoundError(word_id) from e
+        self._written()
+
+    async def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        query = self._collection
+        if order_by:
+            direction = self._firestore.Query.DESCENDING if descending else self._firestore.Query.ASCENDING
+            query = query.order_by(order_by, direction=direction)
+        if fields:
+            query = query.select(list(fields))
+        if start_after:
+            cursor = await self._collection.document(start_after).get()
+            if not cursor.exists:
+                raise ValueError(f"Unknown cursor '{start_after}'")
+            query = query.start_after(cursor)
+        if limit:
+            query = query.limit(limit)
+
+        async def iterate():
+            async for doc in query.stream():
+                yield doc.id, doc.to_dict()
+        return iterate()
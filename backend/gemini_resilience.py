@@ -0,0 +1,308 @@
+"""
+Resilience layer around the Gemini client.
+
+`ResilientGeminiClient` wraps a `genai.Client` (sync and `aio`) so every
+`models.generate_content` call gets:
+
+- a deadline: the call (all attempts included) gives up after `timeout` seconds
+  and raises `GeminiTimeoutError` instead of holding a worker indefinitely;
+- bounded retries of transient errors (5xx, 429, network errors) with full-jitter
+  exponential backoff, as long as the deadline allows;
+- optionally a hedged second request when the first has not answered after
+  `hedge_after` seconds; whichever answers first wins;
+- a shared `CircuitBreaker`: when too many recent attempts failed, calls fail fast
+  with `GeminiUnavailableError` for `open_seconds`, then a single probe decides
+  whether to close it again.
+
+Sync attempts run on a small thread pool so the caller can stop waiting for them.
+"""
+
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class GeminiUnavailableError(Exception):
+    """Gemini cannot be used right now (circuit breaker open or deadline exceeded); try again later."""
+
+
+class GeminiTimeoutError(GeminiUnavailableError, TimeoutError):
+    """A Gemini call did not complete within its deadline."""
+
+
+def is_retryable(error):
+    """Whether an attempt that raised `error` may succeed when repeated (not a 4xx other than 408/429)."""
+    code = getattr(error, 'code', None)
+    return not (isinstance(code, int) and 400 <= code < 500 and code not in (408, 429))
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over the outcomes of the last `window` attempts.
+
+    Opens once at least `min_calls` outcomes are recorded and the share of failures
+    reaches `failure_rate`. After `open_seconds` it lets one probe through
+    (half-open): a success closes it, a failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_rate=0.5, min_calls=10, window=20, open_seconds=30):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.transitions = {self.OPEN: 0, self.HALF_OPEN: 0, self.CLOSED: 0}
+        self._outcomes = deque(maxlen=window)  # True for a success
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        self._state = state
+        self.transitions[state] += 1
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+            print(f"Gemini circuit breaker opened for {self.open_seconds:g}s")
+        elif state == self.CLOSED:
+            self._outcomes.clear()
+            print("Gemini circuit breaker closed")
+
+    @property
+    def state(self):
+        return self._state
+
+    def is_open(self):
+        """True while calls are rejected (open and not yet due for a probe)."""
+        with self._lock:
+            return self._state == self.OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def retry_after(self):
+        """Seconds until the breaker lets a probe through (0 if it is not open)."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def allow(self):
+        """Whether an attempt may be made now. In the half-open state only one probe is allowed at a time."""
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+                self._set_state(self.CLOSED if success else self.OPEN)
+                return
+            if self._state == self.OPEN:
+                return  # Late result of an attempt started before the breaker opened
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._set_state(self.OPEN)
+
+
+class _Resilience:
+    """The deadline / retry / hedging / breaker logic shared by the sync and async wrappers."""
+
+    def __init__(self, breaker, metrics, timeout, max_retries, backoff_base, backoff_max, hedge_after, max_workers):
+        self.breaker = breaker
+        self.metrics = metrics
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gemini')
+
+    def backoff(self, retry):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+
+    def _admit(self, model):
+        if not self.breaker.allow():
+            self.metrics.rejections.inc(model=model)
+            raise GeminiUnavailableError("Gemini circuit breaker is open")
+
+    def _record(self, error):
+        self.breaker.record(error is None or not is_retryable(error))
+
+    def _timed_out(self, model, pending):
+        # Abandoned attempts count as one failure; their eventual results are ignored
+        self.breaker.record(False)
+        self.metrics.timeouts.inc(model=model)
+        for future in pending:
+            future.cancel()
+        return GeminiTimeoutError(f"Gemini did not answer within {self.timeout:g}s")
+
+    def _should_retry(self, model, error, retry, deadline):
+        """Sleep time before the next attempt, or None if `error` should be raised."""
+        if isinstance(error, GeminiUnavailableError) or retry >= self.max_retries or not is_retryable(error):
+            return None
+        delay = self.backoff(retry)
+        if time.monotonic() + delay >= deadline:
+            return None
+        self.metrics.retries.inc(model=model)
+        return delay
+
+    def _observe(self, model, started, outcome):
+        self.metrics.calls.observe(time.perf_counter() - started, model=model, outcome=outcome)
+
+    @staticmethod
+    def _outcome(error):
+        if error is None:
+            return 'ok'
+        if isinstance(error, GeminiTimeoutError):
+            return 'timeout'
+        return 'rejected' if isinstance(error, GeminiUnavailableError) else 'error'
+
+    def call(self, model, attempt):
+        """Run `attempt()` (one generate_content request) with the deadline, retries, hedging and breaker."""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        retry = 0
+        while True:
+            try:
+                response = self._attempts(model, attempt, deadline)
+                self._observe(model, started, 'ok')
+                return response
+            except Exception as e:
+                delay = self._should_retry(model, e, retry, deadline)
+                if delay is None:
+                    self._observe(model, started, self._outcome(e))
+                    raise
+            retry += 1
+            time.sleep(delay)
+
+    def _attempts(self, model, attempt, deadline):
+        """One attempt, plus a hedged one if it is slow. Returns the first response, or raises."""
+        self._admit(model)
+        pending = {self._executor.submit(contextvars.copy_context().run, attempt)}
+        hedge = None
+        hedge_at = time.monotonic() + self.hedge_after if self.hedge_after else None
+        error = None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                raise self._timed_out(model, pending)
+            if hedge_at is not None and now >= hedge_at:
+                hedge_at = None
+                if self.breaker.allow():
+                    self.metrics.hedges.inc(model=model)
+                    hedge = self._executor.submit(contextvars.copy_context().run, attempt)
+                    pending.add(hedge)
+            wait_for = deadline - now if hedge_at is None else min(deadline, hedge_at) - now
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                self._record(error)
+                if error is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is hedge:
+                        self.metrics.hedge_wins.inc(model=model)
+                    return future.result()
+        raise error
+
+    async def acall(self, model, attempt):
+        """Async `call`: `attempt()` returns a coroutine."""
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        retry = 0
+        while True:
+            try:
+                response = await self._async_attempts(model, attempt, deadline)
+                self._observe(model, started, 'ok')
+                return response
+            except Exception as e:
+                delay = self._should_retry(model, e, retry, deadline)
+                if delay is None:
+                    self._observe(model, started, self._outcome(e))
+                    raise
+            retry += 1
+            await asyncio.sleep(delay)
+
+    async def _async_attempts(self, model, attempt, deadline):
+        self._admit(model)
+        pending = {asyncio.ensure_future(attempt())}
+        hedge = None
+        hedge_at = time.monotonic() + self.hedge_after if self.hedge_after else None
+        error = None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    raise self._timed_out(model, pending)
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if self.breaker.allow():
+                        self.metrics.hedges.inc(model=model)
+                        hedge = asyncio.ensure_future(attempt())
+                        pending.add(hedge)
+                wait_for = deadline - now if hedge_at is None else min(deadline, hedge_at) - now
+                done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    self._record(error)
+                    if error is None:
+                        if task is hedge:
+                            self.metrics.hedge_wins.inc(model=model)
+                        return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class _ResilientModels:
+    def __init__(self, models, resilience):
+        self._models = models
+        self._resilience = resilience
+
+    def generate_content(self, model, contents, **kwargs):
+        return self._resilience.call(
+            model, lambda: self._models.generate_content(model=model, contents=contents, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class _ResilientAsyncModels(_ResilientModels):
+    async def generate_content(self, model, contents, **kwargs):
+        return await self._resilience.acall(
+            model, lambda: self._models.generate_content(model=model, contents=contents, **kwargs))
+
+
+class _ResilientAio:
+    def __init__(self, aio, resilience):
+        self._aio = aio
+        self.models = _ResilientAsyncModels(aio.models, resilience)
+
+    def __getattr__(self, name):
+        return getattr(self._aio, name)
+
+
+class ResilientGeminiClient:
+    """Wraps a `genai.Client` so `models.generate_content` (sync and `aio`) is bounded, retried, hedged and guarded."""
+
+    def __init__(self, client, breaker, metrics, timeout=30.0, max_retries=2, backoff_base=0.5, backoff_max=4.0,
+                 hedge_after=0.0, max_workers=32):
+        self._client = client
+        resilience = _Resilience(breaker, metrics, timeout, max_retries, backoff_base, backoff_max, hedge_after,
+                                 max_workers)
+        self.models = _ResilientModels(client.models, resilience)
+        self.aio = _ResilientAio(client.aio, resilience)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
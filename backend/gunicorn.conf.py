@@ -0,0 +1,9 @@
+# Gunicorn settings used by the Dockerfile (command-line flags still apply)
+
+
+def post_worker_init(worker):
+    """Warm up the Firestore and Gemini clients once the worker is ready to serve."""
+    import sys
+    main = sys.modules.get('backend.main') or sys.modules.get('main')
+    if main is not None:
+        main.start_warmup()
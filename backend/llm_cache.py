@@ -0,0 +1,80 @@
+"""
+Persistent, content-addressed cache of Gemini word lookups.
+
+Entries are keyed on (normalized word, model, prompt version), so a word that is
+deleted and searched again, or a collection that is reseeded, does not pay for
+the same LLM call twice, and changing the model or prompt naturally misses. The
+cache is a single SQLite file that can be prewarmed
+(`scripts/prewarm_llm_cache.py`) and baked into the container image.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def cache_key(word, model, prompt_version):
+    normalized = " ".join(word.lower().split())
+    return hashlib.sha256(f"{normalized}\0{model}\0{prompt_version}".encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed map from cache_key(word, model, prompt_version) to the parsed response."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    word TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, word, model, prompt_version):
+        row = self._conn().execute(
+            "SELECT response FROM llm_responses WHERE key = ?", (cache_key(word, model, prompt_version),)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, word, model, prompt_version, response):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, word, model, prompt_version, response, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(word, model, prompt_version), word, model, prompt_version, json.dumps(response), time.time())
+            )
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -1,185 +1,676 @@
+import time
+IMPORT_STARTED = time.perf_counter()  # Start of the cold-start timing reported by /api/startup
 import os
+import sys
 import json
-import requests  # For DictionaryAPI (potentially remove if fully replaced)
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
-from google.cloud import firestore
-from google.oauth2 import service_account
-from google import genai  # New Gemini SDK
 import random
+import threading
+import uuid
+import math
+import hashlib
+
+# Make sibling modules importable both under gunicorn (backend.main) and `python backend/main.py`
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from word_store import (FirestoreWordStore, SQLiteWordStore, ChangeTrackingWordStore, LazyWordStore,
+                        SERVER_TIMESTAMP, DEFAULT_PRACTICE_WEIGHT)
+from word_cache import WordCache
+from view_flusher import ViewCountFlusher
+from singleflight import SingleFlight
+from text_index import SuggestIndex
+from practice_sampler import PracticeIndex
+from practice_queue import PracticeQueue, DistractorBackfill
+from static_assets import AssetManifest
+from llm_cache import LLMResponseCache
+from metrics import (MetricsRegistry, GeminiMetrics, GeminiResilienceMetrics, InstrumentedWordStore,
+                     InstrumentedGeminiClient, current_route)
+from gemini_resilience import CircuitBreaker, GeminiUnavailableError, ResilientGeminiClient
+from startup import StartupTimer, LazyClient
+
+# The Google client libraries are imported and the clients created on first use
+# (get_db / get_gemini_client), so cold starts and static files do not pay for them
+startup_timer = StartupTimer(started=IMPORT_STARTED)
+startup_timer.record('imports', time.perf_counter() - IMPORT_STARTED)
 
 # Initialize Flask App
-app = Flask(__name__, 
-            static_url_path='', 
-            static_folder='../') # Serve files from parent directory
+app = Flask(__name__, static_folder=None)  # Static files are served from the asset manifest below
 CORS(app)  # Enable CORS for all routes
 
-# Initialize Firestore Client with Service Account
-try:
+# Prometheus metrics served at /metrics
+metrics = MetricsRegistry()
+request_latency = metrics.histogram(
+    'http_request_duration_seconds', 'Request latency by route.', ('method', 'route', 'status'))
+store_operations = metrics.counter(
+    'word_store_documents_total', 'Documents read or written in the word store, by route and operation.',
+    ('route', 'op', 'kind'))
+gemini_metrics = GeminiMetrics(metrics)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    startup_timer.request_received()
+    current_route.set(request.url_rule.rule if request.url_rule else 'unmatched')
+
+@app.after_request
+def observe_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        # Streamed bodies (/api/words) are written after this point; this is the time to first byte
+        request_latency.observe(time.perf_counter() - started, method=request.method,
+                                route=current_route.get(), status=response.status_code)
+    return response
+
+@app.teardown_request
+def reset_request_route(exc):
+    current_route.set('background')
+
+# Fingerprinted, precompressed copies of index.html, css/ and js/ kept in memory. The variants are read
+# from STATIC_PRECOMPRESSED_DIR (written by scripts/precompress_static.py when the image is built);
+# anything missing from it is compressed here, with the faster STATIC_BROTLI_QUALITY
+STATIC_PRECOMPRESSED_DIR = os.environ.get('STATIC_PRECOMPRESSED_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_precompressed'))
+with startup_timer.phase('static assets'):
+    static_manifest = AssetManifest(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'),
+                                    precompressed_dir=STATIC_PRECOMPRESSED_DIR,
+                                    brotli_quality=int(os.environ.get('STATIC_BROTLI_QUALITY', 5))).build()
+
+# Firestore Client with Service Account, created on first use
+firestore_credentials = None  # Service account credentials, also used by the async client in asgi.py
+
+def create_firestore_client():
+    global firestore_credentials
     # Check for service account JSON in environment variable
     service_account_json = os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON')
+    if WORD_STORE_BACKEND == 'sqlite':
+        return None
+    from google.cloud import firestore
+    from google.oauth2 import service_account
     if service_account_json:
         service_account_info = json.loads(service_account_json)
-        credentials = service_account.Credentials.from_service_account_info(service_account_info)
-        db = firestore.Client(database='vocabulary', credentials=credentials, project=credentials.project_id)
-        print("Firestore initialized with service account from environment variable")
-    else:
-        # Fall back to default credentials (for Cloud Run)
-        # db = firestore.Client(database='vocabulary')
-        print("Firestore initialized with default credentials")
+        firestore_credentials = service_account.Credentials.from_service_account_info(service_account_info)
+        return firestore.Client(database='vocabulary', credentials=firestore_credentials, project=firestore_credentials.project_id)
+    # Fall back to default credentials (for Cloud Run)
+    # return firestore.Client(database='vocabulary')
+    return None
+
+firestore_client = LazyClient('Firestore client', create_firestore_client, startup_timer)
+
+def get_db():
+    """Firestore client, created on first use. None if it is not configured or failed to initialize."""
+    return firestore_client.get()
+
+# Initialize the word store (WORD_STORE=firestore|sqlite)
+WORD_STORE_BACKEND = os.environ.get('WORD_STORE', 'firestore').lower()
+try:
+    with startup_timer.phase('word store'):
+        if WORD_STORE_BACKEND == 'sqlite':
+            sqlite_path = os.environ.get('WORD_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'vocabulary.sqlite3'))
+            store = SQLiteWordStore(sqlite_path)
+            print(f"Word store initialized with SQLite at {sqlite_path}")
+        elif os.environ.get('GOOGLE_SERVICE_ACCOUNT_JSON'):
+            store = LazyWordStore(lambda: FirestoreWordStore(get_db()) if get_db() else None)
+            print("Word store will use Firestore with the service account from the environment")
+        else:
+            print("Firestore not configured (GOOGLE_SERVICE_ACCOUNT_JSON not set)")
+            store = None
+        if store:
+            # Counts writes made through this instance, used for /api/words ETags
+            store = ChangeTrackingWordStore(InstrumentedWordStore(store, store_operations))
 except Exception as e:
-    print(f"Error initializing Firestore: {e}")
-    db = None
+    print(f"Error initializing word store: {e}")
+    store = None
+
+# In-process read-through cache of word documents, keyed by the lower-cased word
+word_cache = WordCache(
+    maxsize=int(os.environ.get('WORD_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('WORD_CACHE_TTL', 300))
+)
+
+# Write-behind flusher for view_count / last_viewed_at updates (VIEW_FLUSH_INTERVAL_MS=0 writes synchronously)
+view_flusher = ViewCountFlusher(
+    store,
+    interval_ms=float(os.environ.get('VIEW_FLUSH_INTERVAL_MS', 1000)),
+    max_pending=int(os.environ.get('VIEW_FLUSH_MAX_PENDING', 500))
+).start() if store else None
+
+# In-flight Gemini lookups, so concurrent searches for the same new word share one call
+word_lookups = SingleFlight()
+
+# Weighted sampling index over the words usable in practice mode, built lazily on first use.
+# Only documents flagged is_practicable are read (run scripts/backfill_definition_flags.py
+# once for words stored before the flag existed).
+practice_index = PracticeIndex(
+    lambda: store.list_weights(where={"is_practicable": True}) if store else [],
+    refresh_seconds=float(os.environ.get('PRACTICE_INDEX_REFRESH_SECONDS', 0))
+)
+
+def load_suggest_words():
+    if not store:
+        return []
+    return [(word_id, doc.get('english_word') or word_id, doc.get('view_count', 0))
+            for word_id, doc in store.iter_words(order_by=None, fields=['english_word', 'view_count'])]
+
+# Prefix and typo indexes over all stored words (/api/suggest and "did you mean"), built on first use or by the warmup
+suggest_index = SuggestIndex(
+    load_suggest_words,
+    refresh_seconds=float(os.environ.get('SUGGEST_INDEX_REFRESH_SECONDS', 0)),
+    max_typo_distance=int(os.environ.get('TYPO_MAX_DISTANCE', 2))  # 0 disables typo correction
+)
+
+# Google Gemini Client, created on first use
+gemini_api_key = os.environ.get('GEMINI_API_KEY')
+gemini_model = 'gemini-2.0-flash-lite' if gemini_api_key else None  # Model name for the new SDK
+if not gemini_api_key:
+    print("Configuration error for Gemini: GEMINI_API_KEY environment variable not set.")
+
+# Resilience settings for Gemini calls: a deadline per call (all attempts included), retries of
+# transient errors, an optional hedged request (GEMINI_HEDGE_AFTER_SECONDS=0 disables it) and a
+# circuit breaker that fails fast while most recent attempts fail
+GEMINI_TIMEOUT_SECONDS = float(os.environ.get('GEMINI_TIMEOUT_SECONDS', 30))
+GEMINI_MAX_RETRIES = int(os.environ.get('GEMINI_MAX_RETRIES', 2))
+GEMINI_HEDGE_AFTER_SECONDS = float(os.environ.get('GEMINI_HEDGE_AFTER_SECONDS', 0))
+GEMINI_MAX_CONNECTIONS = int(os.environ.get('GEMINI_MAX_CONNECTIONS', 32))
+gemini_breaker = CircuitBreaker(
+    failure_rate=float(os.environ.get('GEMINI_BREAKER_FAILURE_RATE', 0.5)),
+    min_calls=int(os.environ.get('GEMINI_BREAKER_MIN_CALLS', 10)),
+    window=int(os.environ.get('GEMINI_BREAKER_WINDOW', 20)),
+    open_seconds=float(os.environ.get('GEMINI_BREAKER_OPEN_SECONDS', 30))
+)
+gemini_resilience_metrics = GeminiResilienceMetrics(metrics, gemini_breaker)
+
+def create_gemini_client():
+    import httpx
+    from google import genai  # New Gemini SDK
+    from google.genai import types
+    # One shared client: its HTTP connection pools are reused by every request. The HTTP
+    # timeout also ends attempts the resilience layer has stopped waiting for.
+    limits = httpx.Limits(max_connections=GEMINI_MAX_CONNECTIONS, max_keepalive_connections=GEMINI_MAX_CONNECTIONS)
+    http_options = types.HttpOptions(timeout=int(GEMINI_TIMEOUT_SECONDS * 1000),
+                                     client_args={'limits': limits}, async_client_args={'limits': limits})
+    client = InstrumentedGeminiClient(genai.Client(api_key=gemini_api_key, http_options=http_options), gemini_metrics)
+    return ResilientGeminiClient(client, gemini_breaker, gemini_resilience_metrics,
+                                 timeout=GEMINI_TIMEOUT_SECONDS, max_retries=GEMINI_MAX_RETRIES,
+                                 hedge_after=GEMINI_HEDGE_AFTER_SECONDS, max_workers=GEMINI_MAX_CONNECTIONS)
+
+gemini = LazyClient('Gemini client', create_gemini_client, startup_timer)
 
-# Initialize Google Gemini Client
+def get_gemini_client():
+    """Gemini client, created on first use. None if GEMINI_API_KEY is not set or it failed to initialize."""
+    return gemini.get() if gemini_api_key else None
+
+def gemini_available():
+    return bool(gemini_model) and get_gemini_client() is not None
+
+GEMINI_UNAVAILABLE_MESSAGE = "AI service (Gemini) is temporarily unavailable, please try again shortly"
+
+def gemini_retry_after():
+    """Retry-After value (seconds) for responses degraded by an unavailable Gemini."""
+    return str(max(1, math.ceil(gemini_breaker.retry_after())))
+
+def gemini_unavailable_error():
+    """(body, status, headers) returned instead of storing an error placeholder when Gemini is unavailable."""
+    return {"error": GEMINI_UNAVAILABLE_MESSAGE}, 503, {"Retry-After": gemini_retry_after()}
+
+def gemini_unavailable_response():
+    body, status, headers = gemini_unavailable_error()
+    return jsonify(body), status, headers
+
+# Persistent cache of Gemini word lookups keyed on (word, model, prompt version); LLM_CACHE_PATH='' disables it
 try:
-    gemini_api_key = os.environ.get('GEMINI_API_KEY')
-    if not gemini_api_key:
-        raise ValueError("GEMINI_API_KEY environment variable not set.")
-    gemini_client = genai.Client(api_key=gemini_api_key)
-    gemini_model = 'gemini-2.0-flash-lite'  # Model name for the new SDK
-except ValueError as ve:
-    print(f"Configuration error for Gemini: {ve}")
-    gemini_client = None
-    gemini_model = None
+    llm_cache_path = os.environ.get('LLM_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_cache.sqlite3'))
+    llm_cache = LLMResponseCache(llm_cache_path) if llm_cache_path else None
 except Exception as e:
-    print(f"Error initializing Google Gemini client: {e}")
-    gemini_client = None
-    gemini_model = None
+    print(f"Error initializing LLM response cache: {e}")
+    llm_cache = None
+
+def cache_lookups():
+    """(hits, misses) of the in-process caches, read when /metrics is scraped."""
+    lookups = {"word": (word_cache.hits, word_cache.misses)}
+    if llm_cache is not None:
+        lookups["llm"] = (llm_cache.hits, llm_cache.misses)
+    return lookups
+
+metrics.callback('cache_lookups_total', 'Cache lookups by result.', 'counter', lambda: [
+    (labels, count) for name, (hits, misses) in cache_lookups().items()
+    for labels, count in (({"cache": name, "result": "hit"}, hits), ({"cache": name, "result": "miss"}, misses))
+])
+metrics.callback('cache_hit_ratio', 'Fraction of cache lookups that were hits.', 'gauge', lambda: [
+    ({"cache": name}, hits / (hits + misses) if hits + misses else 0.0)
+    for name, (hits, misses) in cache_lookups().items()
+])
 
 # --- External API Functions (Now using Gemini) ---
+# Bump when build_word_prompt or the batched prompt changes, so cached responses are not reused
+WORD_PROMPT_VERSION = 'word-v1'
+
+def extract_json_text(result_text):
+    """Strip the markdown code block Gemini sometimes wraps around JSON."""
+    if "```json" in result_text:
+        return result_text.split("```json")[1].split("```")[0].strip()
+    elif "```" in result_text:
+        return result_text.split("```")[1].split("```")[0].strip()
+    return result_text
+
+def parse_word_entry(parsed_data):
+    """Normalize one parsed Gemini word entry. Returns None if required fields are missing."""
+    if not isinstance(parsed_data, dict):
+        return None
+    definition = parsed_data.get("most_probable_definition", "")
+    translation = parsed_data.get("most_probable_translation", "")
+    # Ensure these are arrays, even if empty
+    other_definitions = parsed_data.get("other_definitions", [])
+    if not isinstance(other_definitions, list):
+        other_definitions = []
+    other_translations = parsed_data.get("other_translations", [])
+    if not isinstance(other_translations, list):
+        other_translations = []
+    if not definition or not translation:
+        return None
+    return {
+        "definition": definition,
+        "translation": translation,
+        "other_definitions": other_definitions,
+        "other_translations": other_translations
+    }
+
+def build_word_prompt(word):
+    """Structured prompt that explicitly requests JSON format for a single word."""
+    return f"""
+    Analyze the English word '{word}' and provide the following information in JSON format:
+    1. most_probable_definition: The most accurate and concise definition in English (REQUIRED)
+    2. most_probable_translation: The most accurate Spanish translation (REQUIRED)
+    3. other_definitions: List any other common definitions or senses of the word (OPTIONAL - can be an empty array if there are no other common definitions)
+    4. other_translations: List any other Spanish translations that might apply in different contexts (OPTIONAL - can be an empty array if there are no other common translations)
+    
+    CRITICALLY IMPORTANT: 
+    - Respond ONLY with valid JSON format
+    - Do not include any explanations before or after the JSON
+    - The only required fields are most_probable_definition and most_probable_translation
+    - If there are no alternative definitions or translations, use empty arrays for those fields
+    
+    Example format:
+    {{
+      "most_probable_definition": "your definition here", 
+      "most_probable_translation": "your translation here",
+      "other_definitions": [], 
+      "other_translations": []
+    }}
+    
+    If the word has multiple meanings, provide the most common definition as most_probable_definition and include others as other_definitions.
+    """
+
+def parse_word_response(word, response):
+    """
+    Turn a Gemini response to `build_word_prompt` into word data (with error
+    placeholders on failure). Returns (word_data, complete), where `complete` is
+    True only for a fully parsed, valid response.
+    """
+    if response.candidates and response.candidates[0].content.parts:
+        # Try to extract JSON content if surrounded by markdown code blocks
+        result_text = extract_json_text(response.text)
+            
+        # Try to parse the JSON response
+        try:
+            parsed_data = json.loads(result_text)
+            
+            # Validate that required fields exist
+            word_data = parse_word_entry(parsed_data)
+            if word_data is None:
+                print(f"Gemini response missing required fields for '{word}': {result_text}")
+                return {
+                    "definition": f"Could not retrieve a clear definition for '{word}' from the AI.",
+                    "translation": f"Could not retrieve a clear translation for '{word}' from the AI.",
+                    "other_definitions": [],
+                    "other_translations": []
+                }, False
+            
+            return word_data, True
+            
+        except json.JSONDecodeError as e:
+            print(f"Failed to parse Gemini response as JSON for '{word}': {e}. Response: {result_text}")
+            # Fall back to simple extraction if JSON parsing fails
+            lines = result_text.strip().split('\n')
+            if len(lines) >= 2:
+                return {
+                    "definition": lines[0].strip(),
+                    "translation": lines[1].strip(),
+                    "other_definitions": [],
+                    "other_translations": []
+                }, False
+    
+    print(f"Gemini API: Unexpected response format for '{word}'. Response: {response}")
+    return {
+        "definition": f"Could not process response for '{word}' from AI.",
+        "translation": f"Could not process translation for '{word}' from AI.",
+        "other_definitions": [],
+        "other_translations": []
+    }, False
+
+def gemini_unavailable_data():
+    return {
+        "definition": "Definition service not available (Gemini not initialized).",
+        "translation": "Translation service not available (Gemini not initialized)."
+    }
+
+def gemini_error_data(e):
+    return {
+        "definition": f"Error during lookup with AI: {str(e)}",
+        "translation": f"Error during translation with AI: {str(e)}",
+        "other_definitions": [],
+        "other_translations": []
+    }
+
+def cached_word_data(word):
+    """Word data from the persistent LLM response cache, or None."""
+    if llm_cache is None or not gemini_model:
+        return None
+    try:
+        return llm_cache.get(word, gemini_model, WORD_PROMPT_VERSION)
+    except Exception as e:
+        print(f"Error reading LLM response cache for '{word}': {e}")
+        return None
+
+def remember_word_data(word, word_data):
+    """Store a complete Gemini word lookup in the persistent LLM response cache."""
+    if llm_cache is None or not gemini_model:
+        return
+    try:
+        llm_cache.put(word, gemini_model, WORD_PROMPT_VERSION, word_data)
+    except Exception as e:
+        print(f"Error writing LLM response cache for '{word}': {e}")
+
+def word_data_without_gemini(word):
+    """Word data that needs no Gemini call (an LLM cache hit, or the placeholder when Gemini is not set up), or None."""
+    cached = cached_word_data(word)
+    if cached is not None:
+        return cached
+    if not gemini_available():
+        return gemini_unavailable_data()
+    return None
+
+def word_data_from_response(word, response):
+    """Parse a Gemini word lookup, caching it if it is complete."""
+    word_data, complete = parse_word_response(word, response)
+    if complete:
+        remember_word_data(word, word_data)
+    return word_data
+
+def word_lookup_failed(word, error):
+    """Word data for a failed Gemini lookup. GeminiUnavailableError is re-raised: the caller answers 503 and stores nothing."""
+    if isinstance(error, GeminiUnavailableError):
+        raise error
+    print(f"Gemini API: Error getting data for '{word}': {error}")
+    return gemini_error_data(error)
+
 def get_word_data_with_gemini(word):
     """Fetches both definition and translation from Gemini API in a single call."""
-    if not gemini_client or not gemini_model:
-        return {
-            "definition": "Definition service not available (Gemini not initialized).",
-            "translation": "Translation service not available (Gemini not initialized)."
-        }
+    word_data = word_data_without_gemini(word)
+    if word_data is not None:
+        return word_data
     try:
-        # Create a structured prompt that explicitly requests JSON format
+        response = get_gemini_client().models.generate_content(
+            model=gemini_model,
+            contents=build_word_prompt(word)
+        )
+        return word_data_from_response(word, response)
+    except Exception as e:
+        return word_lookup_failed(word, e)
+
+GEMINI_BATCH_SIZE = int(os.environ.get('GEMINI_BATCH_SIZE', 20))  # Words per batched prompt
+
+def get_words_data_with_gemini(words):
+    """
+    Fetches definitions and translations for many words, GEMINI_BATCH_SIZE words per
+    prompt. Returns {word: data}; words Gemini failed to answer for are left out.
+    """
+    results = {}
+    for word in words:
+        cached = cached_word_data(word)
+        if cached is not None:
+            results[word] = cached
+    words = [word for word in words if word not in results]
+    if not gemini_available():
+        return results
+    for start in range(0, len(words), GEMINI_BATCH_SIZE):
+        chunk = words[start:start + GEMINI_BATCH_SIZE]
+        word_lines = "\n".join(f"- {word}" for word in chunk)
         prompt = f"""
-        Analyze the English word '{word}' and provide the following information in JSON format:
-        1. most_probable_definition: The most accurate and concise definition in English (REQUIRED)
-        2. most_probable_translation: The most accurate Spanish translation (REQUIRED)
-        3. other_definitions: List any other common definitions or senses of the word (OPTIONAL - can be an empty array if there are no other common definitions)
-        4. other_translations: List any other Spanish translations that might apply in different contexts (OPTIONAL - can be an empty array if there are no other common translations)
+        Analyze each of the following English words:
+{word_lines}
+
+        Respond with a JSON array containing one object per word, in the same order, with these fields:
+        1. word: The word exactly as given above (REQUIRED)
+        2. most_probable_definition: The most accurate and concise definition in English (REQUIRED)
+        3. most_probable_translation: The most accurate Spanish translation (REQUIRED)
+        4. other_definitions: List any other common definitions or senses of the word (OPTIONAL - can be an empty array)
+        5. other_translations: List any other Spanish translations that might apply in different contexts (OPTIONAL - can be an empty array)
         
         CRITICALLY IMPORTANT: 
-        - Respond ONLY with valid JSON format
+        - Respond ONLY with a valid JSON array
         - Do not include any explanations before or after the JSON
-        - The only required fields are most_probable_definition and most_probable_translation
-        - If there are no alternative definitions or translations, use empty arrays for those fields
         
         Example format:
-        {{
-          "most_probable_definition": "your definition here", 
-          "most_probable_translation": "your translation here",
-          "other_definitions": [], 
-          "other_translations": []
-        }}
-        
-        If the word has multiple meanings, provide the most common definition as most_probable_definition and include others as other_definitions.
-        """
-        
-        response = gemini_client.models.generate_content(
-            model=gemini_model,
-            contents=prompt
-        )
-        
-        if response.candidates and response.candidates[0].content.parts:
-            result_text = response.text
-            # Try to extract JSON content if surrounded by markdown code blocks
-            if "```json" in result_text:
-                result_text = result_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in result_text:
-                result_text = result_text.split("```")[1].split("```")[0].strip()
-                
-            # Try to parse the JSON response
-            import json
-            try:
-                parsed_data = json.loads(result_text)
-                
-                # Validate that required fields exist
-                definition = parsed_data.get("most_probable_definition", "")
-                translation = parsed_data.get("most_probable_translation", "")
-                # Ensure these are arrays, even if empty
-                other_definitions = parsed_data.get("other_definitions", [])
-                if not isinstance(other_definitions, list):
-                    other_definitions = []
-                other_translations = parsed_data.get("other_translations", [])
-                if not isinstance(other_translations, list):
-                    other_translations = []
-                
-                # Do some basic validation
-                if not definition or not translation:
-                    print(f"Gemini response missing required fields for '{word}': {result_text}")
-                    return {
-                        "definition": f"Could not retrieve a clear definition for '{word}' from the AI.",
-                        "translation": f"Could not retrieve a clear translation for '{word}' from the AI.",
-                        "other_definitions": [],
-                        "other_translations": []
-                    }
-                
-                return {
-                    "definition": definition,
-                    "translation": translation,
-                    "other_definitions": other_definitions,
-                    "other_translations": other_translations
-                }
-                
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse Gemini response as JSON for '{word}': {e}. Response: {result_text}")
-                # Fall back to simple extraction if JSON parsing fails
-                lines = result_text.strip().split('\n')
-                if len(lines) >= 2:
-                    return {
-                        "definition": lines[0].strip(),
-                        "translation": lines[1].strip(),
-                        "other_definitions": [],
-                        "other_translations": []
-                    }
-        
-        print(f"Gemini API: Unexpected response format for '{word}'. Response: {response}")
-        return {
-            "definition": f"Could not process response for '{word}' from AI.",
-            "translation": f"Could not process translation for '{word}' from AI.",
-            "other_definitions": [],
-            "other_translations": []
-        }
-    except Exception as e:
-        print(f"Gemini API: Error getting data for '{word}': {e}")
-        return {
-            "definition": f"Error during lookup with AI: {str(e)}",
-            "translation": f"Error during translation with AI: {str(e)}",
-            "other_definitions": [],
+        [
+          {{
+            "word": "the word",
+            "most_probable_definition": "your definition here", 
+            "most_probable_translation": "your translation here",
+            "other_definitions": [], 
             "other_translations": []
-        }
+          }}
+        ]
+        """
+        try:
+            response = get_gemini_client().models.generate_content(
+                model=gemini_model,
+                contents=prompt
+            )
+            if not (response.candidates and response.candidates[0].content.parts):
+                print(f"Gemini API: Unexpected batch response format. Response: {response}")
+                continue
+            parsed_data = json.loads(extract_json_text(response.text))
+            if not isinstance(parsed_data, list):
+                print(f"Gemini API: Batch response is not a JSON array: {response.text}")
+                continue
+            requested = {word.lower(): word for word in chunk}
+            for entry in parsed_data:
+                word_data = parse_word_entry(entry)
+                word = requested.get(str(entry.get("word", "")).strip().lower()) if word_data else None
+                if word:
+                    results[word] = word_data
+                    remember_word_data(word, word_data)
+        except GeminiUnavailableError as e:
+            print(f"Gemini API: Skipping the remaining batches: {e}")
+            break
+        except Exception as e:
+            print(f"Gemini API: Error getting batch data for {len(chunk)} words: {e}")
+    return results
+
 # --- API Endpoints ---
 
+def asset_response(asset):
+    """Serve a precompressed static asset, negotiating Accept-Encoding and honouring If-None-Match."""
+    encoding = asset.choose_encoding(request.accept_encodings)
+    etag = f"{asset.etag}-{encoding}"
+    headers = {'Cache-Control': asset.cache_control, 'Vary': 'Accept-Encoding'}
+    if request.if_none_match.contains(etag):
+        response = Response(status=304, headers=headers)
+    else:
+        response = Response(asset.variants[encoding], content_type=asset.content_type, headers=headers)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    return response
+
 # Serve static files and handle frontend routes
 @app.route('/', defaults={'path': 'index.html'})
 @app.route('/search', defaults={'path': None})
 def search_route(path=None):
     """Handle search route with query parameters"""
     # Serve index.html for /search route to handle client-side
-    return send_from_directory('../', 'index.html')
+    return asset_response(static_manifest.index)
 
 @app.route('/<path:path>')
 def serve_static(path):
     """Serve static files or return index.html for frontend route handling"""
-    # Try to serve the requested file
-    try:
-        return send_from_directory('../', path)
-    except:
-        # If the file doesn't exist, return index.html (for SPA routing)
-        return send_from_directory('../', 'index.html')
+    # Unknown paths resolve to index.html (for SPA routing)
+    return asset_response(static_manifest.resolve(path))
+
+DEFINITION_NOT_FOUND = "Definition not found or AI service error."
+# Upper bounds (in characters) of the definition length buckets; longer definitions are "long"
+DEFINITION_LENGTH_BUCKETS = ((10, "short"), (100, "medium"))
+
+def is_usable_definition(definition):
+    """Whether a definition text is not a Gemini or service error message."""
+    return (isinstance(definition, str) and
+            not definition.startswith("Error") and
+            not definition.startswith("Definition service") and
+            not definition.startswith("Could not retrieve"))
+
+def definition_flags(definition):
+    """
+    Quality fields stored with every word, so practice mode can query eligible words
+    instead of re-checking definition texts: `is_practicable` (a real definition that
+    can be asked about) and `definition_length_bucket` ("short" ones are too short to
+    serve as distractors).
+    """
+    length = len(definition) if isinstance(definition, str) else 0
+    bucket = next((name for limit, name in DEFINITION_LENGTH_BUCKETS if length <= limit), "long")
+    return {
+        "is_practicable": is_usable_definition(definition) and definition != DEFINITION_NOT_FOUND,
+        "definition_length_bucket": bucket
+    }
+
+def word_definition_flags(word_data):
+    """The stored definition flags of a word, computed for documents written before they existed."""
+    if "is_practicable" in word_data and "definition_length_bucket" in word_data:
+        return {"is_practicable": word_data["is_practicable"],
+                "definition_length_bucket": word_data["definition_length_bucket"]}
+    return definition_flags(word_data.get("definition"))
+
+def build_word_document(english_word, gemini_data):
+    """Validate Gemini output and build the document stored for a new word."""
+    # Extract the primary definition and translation
+    definition = gemini_data.get("definition")
+    translation = gemini_data.get("translation")
+    other_definitions = gemini_data.get("other_definitions", [])
+    other_translations = gemini_data.get("other_translations", [])
+    
+    # Validate the data
+    if not definition or definition.startswith("Error") or definition.startswith("Definition service not available") or definition.startswith("Could not retrieve"):
+        definition = DEFINITION_NOT_FOUND
+        translation = "Translation not available due to definition error."
+        other_definitions = []
+        other_translations = []
+    
+    if not translation or translation.startswith("Error") or translation.startswith("Translation service") or translation.startswith("Could not reliably translate"):
+        translation = "Translation failed or AI service error."
+        other_translations = []
+
+    # Create the new word entry with all available data
+    return {
+        "english_word": english_word,
+        "definition": definition,
+        "translation": translation,
+        "other_definitions": other_definitions,
+        "other_translations": other_translations,
+        "view_count": 1,
+        "practice_correct_count": 0,
+        "practice_incorrect_count": 0,
+        "created_at": SERVER_TIMESTAMP,
+        "last_viewed_at": SERVER_TIMESTAMP,
+        **definition_flags(definition),
+        # Which model and prompt produced this entry
+        "llm_model": gemini_model,
+        "prompt_version": WORD_PROMPT_VERSION
+    }
+
+def response_copy(word_document):
+    """Serializable copy of a new word document (SERVER_TIMESTAMP fields are dropped)."""
+    return {key: value for key, value in word_document.items() if value is not SERVER_TIMESTAMP}
+
+def with_pending_views(word_id, word_data):
+    """A stored word document with the views not flushed to the store yet added (None stays None)."""
+    if word_data is not None:
+        word_data['view_count'] = word_data.get('view_count', 0) + view_flusher.pending(word_id)
+    return word_data
+
+def corrected_word_id(word_id):
+    """The id of the stored word a missing `word_id` is probably a misspelling of, or None."""
+    corrected_id = suggest_index.correct(word_id)
+    return None if corrected_id == word_id else corrected_id
+
+def find_corrected_word(word_id):
+    """
+    For a word missing from the store, return (corrected_id, word_data) of a stored
+    word within a small edit distance (a likely misspelling), or (None, None).
+    """
+    corrected_id = corrected_word_id(word_id)
+    if corrected_id is None:
+        return None, None
+    word_data = word_cache.get(corrected_id)
+    if word_data is None:
+        word_data = with_pending_views(corrected_id, store.get(corrected_id))
+        if word_data is None:
+            return None, None
+    return corrected_id, word_data
+
+def new_word_refusal(english_word):
+    """(body, status, headers) when a word missing from the store cannot be looked up right now, else None."""
+    if not gemini_available():
+        return {"error": "AI service (Gemini) not initialized"}, 500, {}
+    if gemini_breaker.is_open() and cached_word_data(english_word) is None:
+        return gemini_unavailable_error()
+    return None
+
+def index_new_word(word_id, word_document):
+    """Add a newly stored word to the practice and suggestion indexes."""
+    if word_document["is_practicable"]:
+        practice_index.set_weight(word_id, DEFAULT_PRACTICE_WEIGHT)
+    suggest_index.add(word_id, word_document['english_word'], word_document['view_count'])
+
+def count_search_view(word_id, word_data, record=True):
+    """
+    Count a search view of a stored word: written behind by the view flusher (unless
+    `record` is False because the caller already wrote it), then reflected in the
+    suggestion index and the cached document. Returns the updated word data.
+    """
+    if record:
+        view_flusher.record(word_id)
+    suggest_index.add_views(word_id)
+    word_data['view_count'] = word_data.get('view_count', 0) + 1
+    word_cache.set(word_id, word_data)
+    return word_data
+
+def create_word(word_id, english_word):
+    """
+    Look up a word that is missing from the store with Gemini and persist it.
+    Returns (word_data, created); if another request stored the word in the
+    meantime, the existing document is returned with created=False.
+    """
+    existing = store.get(word_id)
+    if existing is not None:
+        return existing, False
+
+    # Get word data using the combined function
+    new_word_data = build_word_document(english_word, get_word_data_with_gemini(english_word))
+    
+    # Store in database
+    store.set(word_id, new_word_data)
+    index_new_word(word_id, new_word_data)
+    
+    # Don't include created_at / last_viewed_at in the response (not serializable yet)
+    return response_copy(new_word_data), True
 
 @app.route("/api/search", methods=['POST'])
 def search_word():
-    if not db:
-        return jsonify({"error": "Firestore not initialized"}), 500
-    if not gemini_client or not gemini_model:
-        return jsonify({"error": "AI service (Gemini) not initialized"}), 500
+    """
+    Look up a word, creating it with Gemini if it is new. A misspelling of a stored
+    word returns that word with `corrected_from` set (without counting a view),
+    unless `exact` is true.
+    """
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
         
     try:
         data = request.get_json()
@@ -188,204 +679,488 @@ def search_word():
         if not english_word:
             return jsonify({"error": "Word not provided"}), 400
 
-        word_ref = db.collection('words').document(english_word.lower())
-        doc = word_ref.get()
-
-        if doc.exists:  # Word already exists in the database
-            word_data = doc.to_dict()
-            # Update view count and last_viewed_at timestamp
-            word_ref.update({
-                "view_count": firestore.Increment(1),
-                "last_viewed_at": firestore.SERVER_TIMESTAMP
-            })
-            word_data['view_count'] = word_data.get('view_count', 0) + 1
-            return jsonify(word_data), 200
-        else:
-            # Get word data using the combined function
-            gemini_data = get_word_data_with_gemini(english_word)
-            
-            # Extract the primary definition and translation
-            definition = gemini_data.get("definition")
-            translation = gemini_data.get("translation")
-            other_definitions = gemini_data.get("other_definitions", [])
-            other_translations = gemini_data.get("other_translations", [])
-            
-            # Validate the data
-            if not definition or definition.startswith("Error") or definition.startswith("Definition service not available") or definition.startswith("Could not retrieve"):
-                definition = "Definition not found or AI service error."
-                translation = "Translation not available due to definition error."
-                other_definitions = []
-                other_translations = []
-            
-            if not translation or translation.startswith("Error") or translation.startswith("Translation service") or translation.startswith("Could not reliably translate"):
-                translation = "Translation failed or AI service error."
-                other_translations = []
-
-            # Create the new word entry with all available data
-            new_word_data = {
-                "english_word": english_word,
-                "definition": definition,
-                "translation": translation,
-                "other_definitions": other_definitions,
-                "other_translations": other_translations,
-                "view_count": 1,
-                "practice_correct_count": 0,
-                "practice_incorrect_count": 0,
-                "created_at": firestore.SERVER_TIMESTAMP,
-                "last_viewed_at": firestore.SERVER_TIMESTAMP
-            }
-            
-            # Store in database
-            word_ref.set(new_word_data)
-            
-            # Create a serializable copy of the data for the response
-            # Replace SERVER_TIMESTAMP with None or current time for JSON serialization
-            response_data = {
-                "english_word": english_word,
-                "definition": definition,
-                "translation": translation,
-                "other_definitions": other_definitions,
-                "other_translations": other_translations,
-                "view_count": 1,
-                "practice_correct_count": 0,
-                "practice_incorrect_count": 0,
-                # Don't include created_at in the response or use a serializable value
-            }
-            
-            return jsonify(response_data), 201
+        word_id = english_word.lower()
+        word_data = word_cache.get(word_id)
+        if word_data is None:
+            word_data = with_pending_views(word_id, store.get(word_id))
+
+        corrected_from = None
+        if word_data is None and not data.get('exact'):
+            # Probably a misspelling of a stored word: show that instead of paying for a new lookup
+            corrected_id, word_data = find_corrected_word(word_id)
+            if word_data is not None:
+                corrected_from, word_id = english_word, corrected_id
+
+        if word_data is None:
+            refusal = new_word_refusal(english_word)
+            if refusal is not None:
+                body, status, headers = refusal
+                return jsonify(body), status, headers
+
+            # Concurrent requests for the same unseen word share a single Gemini call and write
+            (word_data, created), shared = word_lookups.do(word_id, lambda: create_word(word_id, english_word))
+            if created and not shared:
+                return jsonify(word_data), 201
+            word_data = dict(word_data)
+
+        if corrected_from is not None:
+            # A "did you mean" answer: the user did not ask for this word, so no view is counted
+            return jsonify(dict(word_data, corrected_from=corrected_from)), 200
+
+        # Word already exists in the database
+        # Update view count and last_viewed_at timestamp (written behind, in batches)
+        return jsonify(count_search_view(word_id, word_data)), 200
+    except GeminiUnavailableError as e:
+        print(f"Gemini unavailable in /api/search: {e}")
+        return gemini_unavailable_response()
     except Exception as e:
         print(f"Error in /api/search: {e}")
         return jsonify({"error": f"An internal error occurred: {str(e)}"}), 500
 
+MAX_BATCH_WORDS = 500
+
+@app.route("/api/search/batch", methods=['POST'])
+def search_words_batch():
+    """Resolve many words at once: one multi-document read, batched Gemini prompts and one batched write."""
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
+    try:
+        data = request.get_json()
+        words = data.get('words') if isinstance(data, dict) else None
+        if not isinstance(words, list) or not words:
+            return jsonify({"error": "Words not provided"}), 400
+        if len(words) > MAX_BATCH_WORDS:
+            return jsonify({"error": f"At most {MAX_BATCH_WORDS} words per batch"}), 400
+
+        # Normalize and de-duplicate, keeping the first spelling of each word
+        requested = {}
+        for word in words:
+            english_word = str(word).strip()
+            if english_word and english_word.lower() not in requested:
+                requested[english_word.lower()] = english_word
+
+        existing = store.get_many(list(requested))
+        missing = [english_word for word_id, english_word in requested.items() if word_id not in existing]
+
+        new_docs = {}
+        if missing and gemini_available():
+            for english_word, gemini_data in get_words_data_with_gemini(missing).items():
+                new_docs[english_word.lower()] = build_word_document(english_word, gemini_data)
+
+        created = set()
+
+        def create_words(word_ids):
+            # The Gemini calls took a while: a word created meanwhile is kept, not overwritten
+            stored = store.get_many(word_ids)
+            docs = {word_id: new_docs[word_id] for word_id in word_ids if word_id not in stored}
+            if docs:
+                store.set_many(docs)
+                for word_id, doc in docs.items():
+                    index_new_word(word_id, doc)
+                created.update(docs)
+            return {word_id: (stored[word_id], False) if word_id in stored else (response_copy(new_docs[word_id]), True)
+                    for word_id in word_ids}
+
+        # Created through word_lookups like /api/search: a search for one of these words waits for
+        # this write, and a word another request is creating is waited for instead of written
+        if new_docs:
+            word_lookups.do_many(list(new_docs), create_words)
+
+        results = []
+        for word_id, english_word in requested.items():
+            if word_id in created:
+                results.append({"word": english_word, "status": "created"})
+            elif word_id in existing or word_id in new_docs:
+                results.append({"word": english_word, "status": "existing"})
+            else:
+                results.append({"word": english_word, "status": "failed",
+                                "error": "AI service (Gemini) not initialized" if not gemini_available()
+                                else GEMINI_UNAVAILABLE_MESSAGE if gemini_breaker.is_open()
+                                else "No usable response from AI"})
+
+        existing_count = sum(result["status"] == "existing" for result in results)
+        return jsonify({
+            "results": results,
+            "existing": existing_count,
+            "created": len(created),
+            "failed": len(requested) - existing_count - len(created)
+        }), 200
+    except Exception as e:
+        print(f"Error in /api/search/batch: {e}")
+        return jsonify({"error": "An internal error occurred"}), 500
+
+MAX_WORDS_PAGE_SIZE = 500
+# ETags of /api/words only track writes made by this instance, so they also
+# expire after this many seconds to pick up changes made by other instances.
+WORDS_ETAG_TTL = int(os.environ.get('WORDS_ETAG_TTL', 60))
+INSTANCE_ID = uuid.uuid4().hex
+
+def words_etag(*query):
+    """ETag for a /api/words response, derived from this instance's write counter."""
+    epoch = int(time.time() // WORDS_ETAG_TTL) if WORDS_ETAG_TTL > 0 else 0
+    key = json.dumps([INSTANCE_ID, store.version, epoch, *query])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+def words_query(args):
+    """(limit, start_after, fields) of a /api/words request; raises ValueError for an out-of-range limit."""
+    try:
+        limit = int(args.get('limit')) if args.get('limit') else None
+    except ValueError:
+        limit = None  # Not a number: list without a limit, as before
+    start_after = args.get('start_after') or None
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()] or None
+    if limit is not None and not 0 < limit <= MAX_WORDS_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_WORDS_PAGE_SIZE}")
+    return limit, start_after, fields
+
+def stream_json_array(docs):
+    """Encode an iterable of documents as a JSON array, one document at a time."""
+    yield "["
+    for index, doc in enumerate(docs):
+        yield ("," if index else "") + app.json.dumps(doc)
+    yield "]"
+
 @app.route("/api/words", methods=['GET'])
 def get_words():
-    if not db:
-        return jsonify({"error": "Firestore not initialized"}), 500
+    """
+    List words, newest first. Optional query parameters:
+    - limit / start_after: cursor pagination (the next cursor is sent in X-Next-Cursor)
+    - fields: comma-separated list of fields to return
+    """
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
     try:
-        words_ref = db.collection('words').order_by('created_at', direction=firestore.Query.DESCENDING)
-        docs = words_ref.stream()
-        words_list = [doc.to_dict() for doc in docs]
-        return jsonify(words_list), 200
+        limit, start_after, fields = words_query(request.args)
+
+        # Nothing written since the client's copy: answer without reading the store
+        etag = words_etag(limit, start_after, fields)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        words = store.iter_words(order_by='created_at', descending=True,
+                                 limit=limit, start_after=start_after, fields=fields)
+        headers = {'Cache-Control': 'no-cache'}
+        if limit:
+            # A page is bounded, so read it first to know the next cursor
+            page = list(words)
+            if len(page) == limit:
+                headers['X-Next-Cursor'] = page[-1][0]
+            words = page
+        response = Response(stream_json_array(doc for _, doc in words), mimetype='application/json', headers=headers)
+        response.set_etag(etag)
+        return response, 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"Error in /api/words: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
 @app.route("/api/words/<word>", methods=['DELETE'])
 def delete_word(word):
-    if not db:
-        return jsonify({"error": "Firestore not initialized"}), 500
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
     try:
         word = word.strip().lower()
-        word_ref = db.collection('words').document(word)
-        doc = word_ref.get()
-
-        if not doc.exists:  # Changed from doc.exists() to doc.exists
+        # Delete from the store first: if that fails, the cached and indexed copies stay valid
+        if not store.delete(word):
             return jsonify({"error": "Word not found"}), 404
+        word_cache.invalidate(word)
+        view_flusher.discard(word)
+        practice_index.remove(word)
+        suggest_index.remove(word)
+        practice_queue.discard_word(word)
+        distractor_backfill.discard_word(word)
 
-        word_ref.delete()
         return jsonify({"message": "Word deleted successfully"}), 200
     except Exception as e:
         print(f"Error in delete_word: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
-@app.route("/api/practice", methods=['GET'])
-def get_practice_word():
-    if not db:
-        return jsonify({"error": "Firestore not initialized"}), 500
+PRACTICE_DISTRACTOR_CANDIDATES = 8  # Other words read to find two usable distractor definitions
+PRACTICE_MAX_ATTEMPTS = 5  # Words drawn before giving up on finding one with a usable definition
+
+def build_distractor_prompt(english_word, correct_definition, existing_distractors):
+    prompt = f"Generate one plausible but incorrect dictionary definition for the English word '{english_word}' that could be used as a distractor in a multiple-choice quiz. The correct definition is approximately: '{correct_definition[:100]}...'. Do not include the word itself in the distractor. Make it concise."
+    if existing_distractors:
+        prompt += f" Ensure it is different from: {'; '.join(existing_distractors)}."
+    return prompt
+
+def generate_distractor_with_gemini(english_word, correct_definition, existing_distractors):
+    """Ask Gemini for one plausible but incorrect definition. Returns None on failure."""
+    if not gemini_available():
+        return None
     try:
-        words_ref = db.collection('words')
-        all_words_docs = list(words_ref.limit(100).stream()) 
-        if not all_words_docs:
-            return jsonify({"error": "No words available for practice"}), 404
-
-        # Create a list of (word_doc, weight) tuples for weighted selection
-        weighted_words = []
-        for doc in all_words_docs:
-            word_data = doc.to_dict()
-            # Higher weight means more likely to be selected
-            weight = word_data.get('practice_weight', 10)  # Default weight of 10
-            weighted_words.append((doc, weight))
-
-        # Perform weighted random selection
-        total_weight = sum(weight for _, weight in weighted_words)
-        if total_weight == 0:  # If all weights are 0, use equal weights
-            chosen_doc = random.choice(all_words_docs)
+        gemini_response = get_gemini_client().models.generate_content(
+            model=gemini_model,
+            contents=build_distractor_prompt(english_word, correct_definition, existing_distractors)
+        )
+        if gemini_response.candidates and gemini_response.candidates[0].content.parts:
+            return gemini_response.text.strip()
+    except Exception as e_gemini_distractor:
+        print(f"Error generating distractor with Gemini: {e_gemini_distractor}")
+    return None
+
+def build_practice_question():
+    """
+    Draw a word and build a multiple-choice question for it. Returns None if there
+    is no word with a usable definition.
+    """
+    for _ in range(PRACTICE_MAX_ATTEMPTS):
+        # Weighted random selection over all words (higher practice_weight = more likely)
+        word_id = practice_index.sample()
+        if word_id is None:
+            return None
+        word_data = store.get(word_id)
+        if word_data is None:  # Deleted by another instance since the index was built
+            practice_index.remove(word_id)
+            continue
+        if word_definition_flags(word_data)["is_practicable"]:
+            break
+        # Indexed before its definition flags were updated
+        print(f"Skipping word for practice due to problematic stored definition: {word_data.get('english_word')}")
+        practice_index.remove(word_id)
+    else:
+        return None
+
+    other_ids = practice_index.sample_uniform(PRACTICE_DISTRACTOR_CANDIDATES, exclude={word_id})
+    question, generated, _ = build_question(word_data, list(store.get_many(other_ids).values()))
+    if generated:
+        save_generated_distractors({word_id: word_data.get("generated_distractors", []) + generated})
+    return question
+
+def build_question(word_data, other_words_data, generate=True):
+    """
+    Multiple-choice question for a practicable word, taking distractors from
+    `other_words_data` first. Missing ones are generated with Gemini, or with
+    generate=False left as placeholders. Returns (question, newly generated
+    distractors, number of placeholders).
+    """
+    correct_definition = word_data.get("definition")
+    # Prefer definitions of other stored words as distractors
+    distractor_defs = []
+    other_words_data = list(other_words_data)
+    random.shuffle(other_words_data)
+    
+    for other_word_info in other_words_data:
+        other_def = other_word_info.get("definition")
+        flags = word_definition_flags(other_word_info)
+        if (flags["is_practicable"] and
+            flags["definition_length_bucket"] != "short" and
+            other_def != correct_definition):
+            distractor_defs.append(other_def)
+            if len(distractor_defs) >= 2:
+                break
+
+    # Then distractors Gemini generated for this word before
+    for stored_distractor in word_data.get("generated_distractors", []):
+        if len(distractor_defs) >= 2:
+            break
+        if stored_distractor not in distractor_defs:
+            distractor_defs.append(stored_distractor)
+
+    # Finally generate new ones, and keep them on the word for next time
+    generated = []
+    placeholders = 0
+    while len(distractor_defs) < 2:
+        distractor = None
+        if generate:
+            distractor = generate_distractor_with_gemini(word_data.get("english_word"), correct_definition, distractor_defs)
+        if distractor:
+            generated.append(distractor)
+            distractor_defs.append(distractor)
+            continue
+        placeholders += 1
+        if not generate:
+            distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (placeholder).")
+        elif gemini_available():
+            distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (placeholder due to AI error).")
         else:
-            r = random.uniform(0, total_weight)
-            current_weight = 0
-            chosen_doc = None
-            for doc, weight in weighted_words:
-                current_weight += weight
-                if r <= current_weight:
-                    chosen_doc = doc
-                    break
-            if not chosen_doc:  # Fallback in case of floating point issues
-                chosen_doc = weighted_words[-1][0]
-
-        word_data = chosen_doc.to_dict()
-        correct_definition = word_data.get("definition")
-        
-        # Rest of the function remains the same...
-        if not isinstance(correct_definition, str) or correct_definition.startswith("Error") or correct_definition.startswith("Definition service") or correct_definition.startswith("Could not retrieve"):
-            print(f"Skipping word for practice due to problematic stored definition: {word_data.get('english_word')}")
-            if len(all_words_docs) > 1:
-                return get_practice_word()
-            else:
-                return jsonify({"error": "No suitable words for practice after filtering"}), 404
+            distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (placeholder - AI not init).")
 
-        # Generate distractor definitions...
-        distractor_defs = []
-        other_words_data = [doc.to_dict() for doc in all_words_docs if doc.id != chosen_doc.id]
-        random.shuffle(other_words_data)
-        
-        for other_word_info in other_words_data:
-            other_def = other_word_info.get("definition")
-            if (isinstance(other_def, str) and 
-                other_def != correct_definition and 
-                not other_def.startswith("Error") and 
-                not other_def.startswith("Definition service") and 
-                not other_def.startswith("Could not retrieve") and
-                len(other_def) > 10):
-                distractor_defs.append(other_def)
-                if len(distractor_defs) >= 2:
-                    break
-        
-        while len(distractor_defs) < 2:
-            if gemini_client and gemini_model:
-                try:
-                    prompt = f"Generate one plausible but incorrect dictionary definition for the English word '{word_data.get('english_word')}' that could be used as a distractor in a multiple-choice quiz. The correct definition is approximately: '{correct_definition[:100]}...'. Do not include the word itself in the distractor. Make it concise."
-                    if distractor_defs:
-                        prompt += f" Ensure it is different from: {'; '.join(distractor_defs)}."
-                    gemini_response = gemini_client.models.generate_content(
-                        model=gemini_model,
-                        contents=prompt
-                    )
-                    if gemini_response.candidates and gemini_response.candidates[0].content.parts:
-                        distractor_defs.append(gemini_response.text.strip())
-                    else:
-                        distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (AI generated placeholder).")
-                except Exception as e_gemini_distractor:
-                    print(f"Error generating distractor with Gemini: {e_gemini_distractor}")
-                    distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (placeholder due to AI error).")
-            else:
-                 distractor_defs.append(f"Incorrect option {len(distractor_defs) + 1} (placeholder - AI not init).")
+    options = [correct_definition] + distractor_defs
+    random.shuffle(options)
 
-        options = [correct_definition] + distractor_defs
-        random.shuffle(options)
+    return {
+        "english_word": word_data.get("english_word"),
+        "options": options,
+        "correct_definition": correct_definition
+    }, generated, placeholders
 
-        return jsonify({
-            "english_word": word_data.get("english_word"),
-            "options": options,
-            "correct_definition": correct_definition 
-        }), 200
+def save_generated_distractors(distractors_by_id):
+    """Keep Gemini-generated distractors on their words ({word_id: full list}) in one batched write."""
+    try:
+        store.increment_many({word_id: {} for word_id in distractors_by_id},
+                             fields_by_id={word_id: {"generated_distractors": distractors}
+                                           for word_id, distractors in distractors_by_id.items()})
+        for word_id in distractors_by_id:
+            word_cache.invalidate(word_id)
+    except Exception as e:
+        print(f"Error storing generated distractors for {', '.join(distractors_by_id)}: {e}")
+
+def fill_distractors(word_id):
+    """Generate and store the distractors a word lacks, so its questions need no other words' definitions."""
+    word_data = store.get(word_id)
+    if word_data is None or not word_definition_flags(word_data)["is_practicable"]:
+        return
+    distractors = list(word_data.get("generated_distractors", []))
+    generated = False
+    while len(distractors) < 2:
+        distractor = generate_distractor_with_gemini(word_data.get("english_word"), word_data.get("definition"),
+                                                     distractors)
+        if not distractor:
+            break
+        distractors.append(distractor)
+        generated = True
+    if generated:
+        save_generated_distractors({word_id: distractors})
+
+# Distractors for words served with placeholders in a practice session, generated in the background
+distractor_backfill = DistractorBackfill(fill_distractors)
+
+def build_practice_session(n):
+    """
+    Up to `n` questions for distinct words drawn by weight, reading the words and
+    the distractor candidates with a single multi-document read. No Gemini call is
+    made in the request: missing distractors are placeholders, and the words are
+    queued on distractor_backfill so their next questions have real ones.
+    """
+    word_ids = practice_index.sample_distinct(n)
+    if not word_ids:
+        return []
+    # The drawn words double as distractors for each other; top up with a few more
+    extra_ids = practice_index.sample_uniform(max(0, PRACTICE_DISTRACTOR_CANDIDATES - len(word_ids) + 1),
+                                              exclude=set(word_ids))
+    docs = store.get_many(word_ids + extra_ids)
+
+    questions = []
+    for word_id in word_ids:
+        word_data = docs.get(word_id)
+        if word_data is None:  # Deleted by another instance since the index was built
+            practice_index.remove(word_id)
+            continue
+        if not word_definition_flags(word_data)["is_practicable"]:
+            practice_index.remove(word_id)
+            continue
+        others = [doc for other_id, doc in docs.items() if other_id != word_id]
+        question, _, placeholders = build_question(word_data, others, generate=False)
+        questions.append(question)
+        if placeholders and gemini_available():
+            distractor_backfill.request(word_id)
+    return questions
+
+# Practice questions prepared ahead of time by a background thread (PRACTICE_QUEUE_SIZE=0 disables it)
+practice_queue = PracticeQueue(build_practice_question, size=int(os.environ.get('PRACTICE_QUEUE_SIZE', 5)))
+
+background_services_started = False
+background_services_lock = threading.Lock()
+
+def start_background_services():
+    """Start the threads that read the whole store (the suggest index build) once."""
+    global background_services_started
+    if background_services_started or not store:
+        return
+    with background_services_lock:
+        if not background_services_started:
+            suggest_index.start()
+            background_services_started = True
+
+def warm_up():
+    """Create the clients and start the background services, so the first requests do not wait for them."""
+    started = time.perf_counter()
+    get_db()
+    get_gemini_client()
+    start_background_services()
+    startup_timer.record('warmup', time.perf_counter() - started)
+
+def start_warmup():
+    """Run warm_up in a background thread unless STARTUP_WARMUP=0. Called once the server is listening."""
+    if os.environ.get('STARTUP_WARMUP', '1') == '0':
+        return
+    threading.Thread(target=warm_up, name='startup-warmup', daemon=True).start()
+
+MAX_SUGGESTIONS = 50
+
+@app.route("/api/suggest", methods=['GET'])
+def suggest_words():
+    """Autocomplete: stored words with a token starting with `q`, most viewed first (at most `k`)."""
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
+    try:
+        query = request.args.get('q', '')
+        k = request.args.get('k', 10, type=int)
+        if not 0 < k <= MAX_SUGGESTIONS:
+            return jsonify({"error": f"k must be between 1 and {MAX_SUGGESTIONS}"}), 400
+        suggestions = [{"english_word": english_word, "view_count": view_count}
+                       for _, english_word, view_count in suggest_index.suggest(query, k)]
+        return jsonify(suggestions), 200
+    except Exception as e:
+        print(f"Error in /api/suggest: {e}")
+        return jsonify({"error": "An internal error occurred"}), 500
+
+@app.route("/api/practice", methods=['GET'])
+def get_practice_word():
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
+    try:
+        # The UI practises in sessions: only prefetch single questions once a client asks for them
+        practice_queue.start()
+        question = practice_queue.pop()
+        if question is None:
+            # Queue empty (e.g. right after startup): build one in the request
+            question = build_practice_question()
+        if question is None:
+            return jsonify({"error": "No suitable words for practice"}), 404
+        return jsonify(question), 200
     except Exception as e:
         print(f"Error in /api/practice: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
+MAX_PRACTICE_SESSION = 50
+
+@app.route("/api/practice/session", methods=['GET'])
+def get_practice_session():
+    """Up to `n` questions (default 10) for distinct words, read from the store in one round trip."""
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
+    try:
+        n = request.args.get('n', 10, type=int)
+        if not 0 < n <= MAX_PRACTICE_SESSION:
+            return jsonify({"error": f"n must be between 1 and {MAX_PRACTICE_SESSION}"}), 400
+        questions = build_practice_session(n)
+        if not questions:
+            return jsonify({"error": "No suitable words for practice"}), 404
+        return jsonify({"questions": questions}), 200
+    except Exception as e:
+        print(f"Error in /api/practice/session: {e}")
+        return jsonify({"error": "An internal error occurred"}), 500
+
+def practice_answer_update(current_data, is_correct):
+    """Counter increments and new practice_weight for an answer: (counters, fields)."""
+    current_weight = current_data.get('practice_weight', DEFAULT_PRACTICE_WEIGHT)
+    correct_count = current_data.get('practice_correct_count', 0)
+    incorrect_count = current_data.get('practice_incorrect_count', 0)
+
+    if is_correct:
+        counters = {"practice_correct_count": 1}
+        update_fields = {"practice_weight": max(1, current_weight - 2 - (correct_count // 2))}
+    else:
+        counters = {"practice_incorrect_count": 1}
+        update_fields = {"practice_weight": current_weight + 3 + incorrect_count}
+    return counters, update_fields
+
+def answer_recorded(english_word, current_data, update_fields):
+    """Reflect an answer written to the store in the word cache and the practice index."""
+    word_cache.invalidate(english_word)
+    if word_definition_flags(current_data)["is_practicable"]:
+        practice_index.set_weight(english_word, update_fields["practice_weight"])
+
 @app.route("/api/answer", methods=['POST'])
 def submit_answer():
-    if not db:
-        return jsonify({"error": "Firestore not initialized"}), 500
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
     try:
         data = request.get_json()
         english_word = data.get('word', '').strip().lower()
@@ -394,31 +1169,91 @@ def submit_answer():
         if not english_word or is_correct is None:
             return jsonify({"error": "Word or correctness not provided"}), 400
 
-        word_ref = db.collection('words').document(english_word)
-        doc = word_ref.get()
+        current_data = store.get(english_word)
 
-        if not doc.exists:  # Fixed: removed parentheses, using 'exists' as an attribute
+        if current_data is None:
             return jsonify({"error": "Word not found"}), 404
 
-        current_data = doc.to_dict()
-        current_weight = current_data.get('practice_weight', 10)
-        correct_count = current_data.get('practice_correct_count', 0)
-        incorrect_count = current_data.get('practice_incorrect_count', 0)
-
-        update_fields = {}
-        if is_correct:
-            update_fields["practice_correct_count"] = firestore.Increment(1)
-            update_fields["practice_weight"] = max(1, current_weight - 2 - (correct_count // 2)) 
-        else:
-            update_fields["practice_incorrect_count"] = firestore.Increment(1)
-            update_fields["practice_weight"] = current_weight + 3 + incorrect_count
-        
-        word_ref.update(update_fields)
+        counters, update_fields = practice_answer_update(current_data, is_correct)
+        store.increment(english_word, counters, update_fields)
+        answer_recorded(english_word, current_data, update_fields)
         
         return jsonify({"message": "Practice stats updated"}), 200
     except Exception as e:
         print(f"Error in /api/answer: {e}")
         return jsonify({"error": "An internal error occurred"}), 500
 
+MAX_BATCH_ANSWERS = 500
+
+@app.route("/api/answer/batch", methods=['POST'])
+def submit_answers_batch():
+    """Apply many answers ({"answers": [{"word", "is_correct"}, ...]}) with one read and one batched write."""
+    if not store:
+        return jsonify({"error": "Word store not initialized"}), 500
+    try:
+        data = request.get_json()
+        answers = data.get('answers') if isinstance(data, dict) else None
+        if not isinstance(answers, list) or not answers:
+            return jsonify({"error": "Answers not provided"}), 400
+        if len(answers) > MAX_BATCH_ANSWERS:
+            return jsonify({"error": f"At most {MAX_BATCH_ANSWERS} answers per batch"}), 400
+        parsed = []
+        for answer in answers:
+            english_word = str(answer.get('word', '')).strip().lower() if isinstance(answer, dict) else ''
+            is_correct = answer.get('is_correct') if isinstance(answer, dict) else None
+            if not english_word or is_correct is None:
+                return jsonify({"error": "Word or correctness not provided"}), 400
+            parsed.append((english_word, is_correct))
+
+        docs = store.get_many(list(dict.fromkeys(word for word, _ in parsed)))
+        # Answers to the same word are applied in order, each on top of the previous one
+        counters_by_id, fields_by_id = {}, {}
+        for english_word, is_correct in parsed:
+            current_data = docs.get(english_word)
+            if current_data is None:
+                continue
+            counters, update_fields = practice_answer_update(current_data, is_correct)
+            totals = counters_by_id.setdefault(english_word, {})
+            for key, amount in counters.items():
+                totals[key] = totals.get(key, 0) + amount
+                current_data[key] = current_data.get(key, 0) + amount
+            current_data.update(update_fields)
+            fields_by_id[english_word] = update_fields
+
+        if counters_by_id:
+            store.increment_many(counters_by_id, fields_by_id=fields_by_id)
+        for english_word, update_fields in fields_by_id.items():
+            answer_recorded(english_word, docs[english_word], update_fields)
+
+        return jsonify({
+            "message": "Practice stats updated",
+            "updated": len(counters_by_id),
+            "not_found": sorted({word for word, _ in parsed if word not in docs})
+        }), 200
+    except Exception as e:
+        print(f"Error in /api/answer/batch: {e}")
+        return jsonify({"error": "An internal error occurred"}), 500
+
+@app.route("/api/cache/stats", methods=['GET'])
+def get_cache_stats():
+    """Report hit/miss counters of the in-process word cache"""
+    return jsonify(word_cache.stats()), 200
+
+@app.route("/api/startup", methods=['GET'])
+def get_startup_report():
+    """Cold-start timings: import phases, lazy client initialization and time to first request"""
+    return jsonify(startup_timer.report()), 200
+
+metrics.callback('startup_phase_seconds', 'Duration of startup phases and lazy client initialization.', 'gauge',
+                 lambda: [({"phase": phase}, seconds) for phase, seconds in startup_timer.report()["phases"].items()])
+
+@app.route("/metrics", methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of the metrics above"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4'), 200
+
+startup_timer.imported()
+
 if __name__ == '__main__':
+    start_warmup()
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 8080)))
\ No newline at end of file
@@ -0,0 +1,397 @@
+"""
+Minimal in-process metrics exported in the Prometheus text format (`/metrics`).
+
+`MetricsRegistry` holds counters, histograms and callback metrics (values read
+from other objects, e.g. cache stats, at scrape time). The wrappers at the
+bottom count word store operations per route and time Gemini calls; the route
+comes from `current_route`, which the request middleware sets, so work done by
+background threads is reported as route="background".
+"""
+
+import contextvars
+import threading
+import time
+
+current_route = contextvars.ContextVar('current_route', default='background')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, list(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+
+class Histogram:
+    """Cumulative histogram (`_bucket`, `_sum`, `_count`) with optional labels."""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def time(self, **labels):
+        """Context manager observing the duration of its block in seconds."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            values = {key: list(entry) for key, entry in self._values.items()}
+        samples = []
+        for key, entry in sorted(values.items()):
+            labels = list(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets, entry):
+                samples.append((f'{self.name}_bucket', labels + [('le', _format_value(bound))], count))
+            samples.append((f'{self.name}_sum', labels, entry[-2]))
+            samples.append((f'{self.name}_count', labels, entry[-1]))
+        return samples
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class CallbackMetric:
+    """Metric whose samples are read at scrape time: `read()` returns [(labels dict, value)]."""
+
+    def __init__(self, name, documentation, metric_type, read):
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self._read = read
+
+    def samples(self):
+        return [(self.name, sorted(labels.items()), value) for labels, value in self._read()]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, metric_type, read):
+        return self.register(CallbackMetric(name, documentation, metric_type, read))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {e}")
+                continue
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in samples:
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedWordStore:
+    """
+    Wraps a `WordStore` and counts the documents read and written, per route and
+    operation, in `operations` (a Counter labelled route, op, kind).
+    """
+
+    READS = ('get', 'get_many', 'iter_words', 'list_words', 'list_weights')
+    WRITES = ('set', 'set_many', 'update', 'increment', 'increment_many', 'delete')
+
+    def __init__(self, inner, operations):
+        self.inner = inner
+        self.operations = operations
+
+    def _count(self, op, kind, documents):
+        self.operations.inc(documents, route=current_route.get(), op=op, kind=kind)
+
+    def get(self, word_id):
+        self._count('get', 'read', 1)
+        return self.inner.get(word_id)
+
+    def get_many(self, word_ids):
+        word_ids = list(word_ids)
+        self._count('get_many', 'read', len(word_ids))
+        return self.inner.get_many(word_ids)
+
+    def iter_words(self, *args, **kwargs):
+        words = self.inner.iter_words(*args, **kwargs)
+        route = current_route.get()
+
+        def count(words):
+            # Streamed responses are consumed after the request handler returned
+            read = 0
+            try:
+                for item in words:
+                    read += 1
+                    yield item
+            finally:
+                self.operations.inc(read, route=route, op='iter_words', kind='read')
+        return count(words)
+
+    def list_words(self, *args, **kwargs):
+        docs = self.inner.list_words(*args, **kwargs)
+        self._count('list_words', 'read', len(docs))
+        return docs
+
+    def list_weights(self, *args, **kwargs):
+        weights = self.inner.list_weights(*args, **kwargs)
+        self._count('list_weights', 'read', len(weights))
+        return weights
+
+    def set(self, word_id, data):
+        self._count('set', 'write', 1)
+        return self.inner.set(word_id, data)
+
+    def set_many(self, docs_by_id):
+        self._count('set_many', 'write', len(docs_by_id))
+        return self.inner.set_many(docs_by_id)
+
+    def update(self, word_id, fields):
+        self._count('update', 'write', 1)
+        return self.inner.update(word_id, fields)
+
+    def increment(self, word_id, counters, fields=None):
+        self._count('increment', 'write', 1)
+        return self.inner.increment(word_id, counters, fields)
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        self._count('increment_many', 'write', len(counters_by_id))
+        return self.inner.increment_many(counters_by_id, fields, fields_by_id)
+
+    def delete(self, word_id):
+        self._count('delete', 'write', 1)
+        return self.inner.delete(word_id)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class InstrumentedAsyncWordStore:
+    """`InstrumentedWordStore` for an `AsyncWordStore`."""
+
+    def __init__(self, inner, operations):
+        self.inner = inner
+        self.operations = operations
+
+    def _count(self, op, kind, documents):
+        self.operations.inc(documents, route=current_route.get(), op=op, kind=kind)
+
+    async def get(self, word_id):
+        self._count('get', 'read', 1)
+        return await self.inner.get(word_id)
+
+    async def get_many(self, word_ids):
+        word_ids = list(word_ids)
+        self._count('get_many', 'read', len(word_ids))
+        return await self.inner.get_many(word_ids)
+
+    async def set(self, word_id, data):
+        self._count('set', 'write', 1)
+        return await self.inner.set(word_id, data)
+
+    async def increment(self, word_id, counters, fields=None):
+        self._count('increment', 'write', 1)
+        return await self.inner.increment(word_id, counters, fields)
+
+    async def iter_words(self, *args, **kwargs):
+        words = await self.inner.iter_words(*args, **kwargs)
+        route = current_route.get()
+
+        async def count():
+            read = 0
+            try:
+                async for item in words:
+                    read += 1
+                    yield item
+            finally:
+                self.operations.inc(read, route=route, op='iter_words', kind='read')
+        return count()
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+class GeminiMetrics:
+    """The Gemini call metrics shared by the sync and async client wrappers."""
+
+    def __init__(self, registry):
+        self.latency = registry.histogram(
+            'gemini_request_duration_seconds', 'Duration of Gemini generate_content calls.', ('route', 'model', 'outcome'))
+        self.errors = registry.counter(
+            'gemini_errors_total', 'Gemini generate_content calls that raised.', ('route', 'model'))
+        self.prompt_chars = registry.histogram(
+            'gemini_prompt_chars', 'Size of Gemini prompts in characters.', ('model',), SIZE_BUCKETS)
+        self.response_chars = registry.histogram(
+            'gemini_response_chars', 'Size of Gemini response texts in characters.', ('model',), SIZE_BUCKETS)
+        self.tokens = registry.counter(
+            'gemini_tokens_total', 'Tokens reported in Gemini usage metadata.', ('model', 'kind'))
+
+    def observe(self, model, contents, started, response=None, error=None):
+        route = current_route.get()
+        self.latency.observe(time.perf_counter() - started, route=route, model=model,
+                             outcome='error' if error is not None else 'ok')
+        self.prompt_chars.observe(len(contents) if isinstance(contents, str) else len(str(contents)), model=model)
+        if error is not None:
+            self.errors.inc(route=route, model=model)
+            return
+        try:
+            self.response_chars.observe(len(response.text or ''), model=model)
+        except Exception:
+            pass
+        usage = getattr(response, 'usage_metadata', None)
+        for kind, attribute in (('prompt', 'prompt_token_count'), ('response', 'candidates_token_count')):
+            count = getattr(usage, attribute, None)
+            if isinstance(count, int):
+                self.tokens.inc(count, model=model, kind=kind)
+
+
+class GeminiResilienceMetrics:
+    """Metrics of the Gemini resilience layer (deadlines, retries, hedging and the circuit breaker)."""
+
+    BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+
+    def __init__(self, registry, breaker):
+        self.calls = registry.histogram(
+            'gemini_call_duration_seconds', 'Duration of Gemini calls including retries and hedges.',
+            ('model', 'outcome'))
+        self.retries = registry.counter('gemini_retries_total', 'Gemini attempts retried after a transient error.',
+                                        ('model',))
+        self.timeouts = registry.counter('gemini_timeouts_total', 'Gemini calls that exceeded their deadline.',
+                                         ('model',))
+        self.hedges = registry.counter('gemini_hedged_requests_total', 'Hedged second Gemini requests sent.',
+                                       ('model',))
+        self.hedge_wins = registry.counter('gemini_hedge_wins_total', 'Hedged Gemini requests that answered first.',
+                                           ('model',))
+        self.rejections = registry.counter(
+            'gemini_circuit_breaker_rejections_total', 'Gemini calls rejected while the circuit breaker was open.',
+            ('model',))
+        registry.callback('gemini_circuit_breaker_state', 'Gemini circuit breaker state (0 closed, 1 half-open, 2 open).',
+                          'gauge', lambda: [({}, self.BREAKER_STATES[breaker.state])])
+        registry.callback('gemini_circuit_breaker_transitions_total', 'Gemini circuit breaker state changes.',
+                          'counter', lambda: [({'state': state}, count) for state, count in breaker.transitions.items()])
+
+
+class _InstrumentedModels:
+    def __init__(self, models, metrics):
+        self._models = models
+        self._metrics = metrics
+
+    def generate_content(self, model, contents, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self._models.generate_content(model=model, contents=contents, **kwargs)
+        except Exception as e:
+            self._metrics.observe(model, contents, started, error=e)
+            raise
+        self._metrics.observe(model, contents, started, response=response)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self._models, name)
+
+
+class _InstrumentedAsyncModels(_InstrumentedModels):
+    async def generate_content(self, model, contents, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await self._models.generate_content(model=model, contents=contents, **kwargs)
+        except Exception as e:
+            self._metrics.observe(model, contents, started, error=e)
+            raise
+        self._metrics.observe(model, contents, started, response=response)
+        return response
+
+
+class _InstrumentedAio:
+    def __init__(self, aio, metrics):
+        self._aio = aio
+        self.models = _InstrumentedAsyncModels(aio.models, metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._aio, name)
+
+
+class InstrumentedGeminiClient:
+    """Wraps a `genai.Client` so `models.generate_content` (sync and `aio`) is timed and sized."""
+
+    def __init__(self, client, metrics):
+        self._client = client
+        self.models = _InstrumentedModels(client.models, metrics)
+        self.aio = _InstrumentedAio(client.aio, metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
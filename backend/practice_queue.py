@@ -0,0 +1,164 @@
+"""
+Prefetched practice questions.
+
+A background producer keeps up to `size` ready-made questions (word, correct
+definition and shuffled options) in a queue, so `/api/practice` only has to pop
+one instead of reading distractors and possibly calling Gemini inside the request.
+
+Practice sessions are built in the request from stored definitions only; words
+that lacked distractors are handed to a `DistractorBackfill`, which generates
+them in the background so the word's next question has real ones.
+"""
+
+import atexit
+import threading
+from collections import deque
+
+
+class PracticeQueue:
+    """Bounded queue of practice questions refilled by a daemon thread."""
+
+    def __init__(self, build_question, size=5, retry_seconds=5):
+        self.build_question = build_question
+        self.size = size
+        self.retry_seconds = retry_seconds
+        self._questions = deque()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.served = 0
+        self.misses = 0
+
+    def start(self):
+        """Start the producer thread; later calls do nothing."""
+        with self._cond:
+            if self.size <= 0 or self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run, name='practice-queue', daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def pop(self):
+        """Return a ready question, or None if the queue is empty."""
+        with self._cond:
+            if not self._questions:
+                self.misses += 1
+                return None
+            question = self._questions.popleft()
+            self.served += 1
+            self._cond.notify_all()
+            return question
+
+    def discard_word(self, word_id):
+        """Drop queued questions about a word (e.g. because it was deleted or changed)."""
+        with self._cond:
+            kept = [q for q in self._questions if q["english_word"].lower() != word_id]
+            if len(kept) != len(self._questions):
+                self._questions = deque(kept)
+                self._cond.notify_all()
+
+    def clear(self):
+        with self._cond:
+            self._questions.clear()
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"ready": len(self._questions), "size": self.size, "served": self.served, "misses": self.misses}
+
+    def _queued_words(self):
+        return {q["english_word"].lower() for q in self._questions}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and len(self._questions) >= self.size:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                queued_words = self._queued_words()
+            try:
+                question = None
+                # Avoid queueing the same word twice when there is a choice
+                for _ in range(3):
+                    question = self.build_question()
+                    if question is None or question["english_word"].lower() not in queued_words:
+                        break
+            except Exception as e:
+                print(f"Error preparing practice question: {e}")
+                question = None
+            with self._cond:
+                if question is not None:
+                    self._questions.append(question)
+                else:
+                    # Nothing to practise yet (or an error); try again later
+                    self._cond.wait(self.retry_seconds)
+
+
+class DistractorBackfill:
+    """Runs `fill(word_id)` for requested words, one at a time, on a daemon thread."""
+
+    def __init__(self, fill, max_pending=100):
+        self.fill = fill
+        self.max_pending = max_pending
+        self._pending = {}  # word_id -> None, in request order
+        self._active = None
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        self.filled = 0
+        self.dropped = 0
+
+    def request(self, word_id):
+        """Queue a word, unless it is already queued or being filled. Returns False if the queue is full."""
+        with self._cond:
+            if self._stopped or word_id in self._pending or word_id == self._active:
+                return True
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self._pending[word_id] = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='distractor-backfill', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+            self._cond.notify_all()
+            return True
+
+    def discard_word(self, word_id):
+        with self._cond:
+            self._pending.pop(word_id, None)
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {"pending": len(self._pending), "filled": self.filled, "dropped": self.dropped}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and not self._pending:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                self._active = next(iter(self._pending))
+                del self._pending[self._active]
+            try:
+                self.fill(self._active)
+                with self._cond:
+                    self.filled += 1
+            except Exception as e:
+                print(f"Error generating distractors for '{self._active}': {e}")
+            finally:
+                with self._cond:
+                    self._active = None
@@ -0,0 +1,254 @@
+"""
+Weighted sampling index for practice mode.
+
+`WeightedSampler` keeps every word's `practice_weight` in a Fenwick (binary
+indexed) tree, so drawing a word proportionally to its weight and changing a
+weight both cost O(log n), without scanning the collection.
+
+`PracticeIndex` wraps a sampler that is built lazily from the word store on first
+use and then maintained in place as words are created, answered and deleted.
+"""
+
+import random
+import threading
+import time
+
+
+class WeightedSampler:
+    """Fenwick tree over non-negative weights keyed by word id."""
+
+    def __init__(self, items=()):
+        self._ids = []        # slot -> word id (None for a freed slot)
+        self._weights = []    # slot -> weight
+        self._tree = [0.0]    # 1-based Fenwick tree over the slots
+        self._slots = {}      # word id -> slot
+        self._free = []       # freed slots available for reuse
+        self.rebuild(items)
+
+    def rebuild(self, items):
+        """Replace the contents with (word_id, weight) pairs in O(n)."""
+        self._ids, self._weights, self._slots, self._free = [], [], {}, []
+        for word_id, weight in items:
+            if word_id in self._slots:
+                self._weights[self._slots[word_id]] = max(0.0, float(weight))
+                continue
+            self._slots[word_id] = len(self._ids)
+            self._ids.append(word_id)
+            self._weights.append(max(0.0, float(weight)))
+        tree = [0.0] + list(self._weights)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, word_id):
+        return word_id in self._slots
+
+    def _add(self, slot, delta):
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        total = 0.0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def total(self):
+        return self._prefix(len(self._tree) - 1)
+
+    def set_weight(self, word_id, weight):
+        """Insert a word or change its weight."""
+        weight = max(0.0, float(weight))
+        slot = self._slots.get(word_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+                self._ids[slot] = word_id
+                self._weights[slot] = 0.0
+            else:
+                # Append a slot; its tree node covers the range (i - lowbit(i), i]
+                slot = len(self._ids)
+                self._ids.append(word_id)
+                self._weights.append(0.0)
+                i = slot + 1
+                self._tree.append(self._prefix(i - 1) - self._prefix(i - (i & -i)))
+            self._slots[word_id] = slot
+        self._add(slot, weight - self._weights[slot])
+        self._weights[slot] = weight
+
+    def get_weight(self, word_id):
+        slot = self._slots.get(word_id)
+        return None if slot is None else self._weights[slot]
+
+    def remove(self, word_id):
+        slot = self._slots.pop(word_id, None)
+        if slot is None:
+            return
+        self._add(slot, -self._weights[slot])
+        self._weights[slot] = 0.0
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def sample(self, rng=random):
+        """Draw a word id with probability proportional to its weight (None if empty)."""
+        if not self._slots:
+            return None
+        total = self.total()
+        if total <= 1e-9:  # If all weights are 0, use equal weights
+            return self.sample_uniform(1, rng=rng)[0]
+        r = rng.uniform(0, total)
+        # Binary lifting: find the first slot whose prefix sum reaches r
+        pos, step = 0, 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] < r:
+                pos = nxt
+                r -= self._tree[nxt]
+            step >>= 1
+        slot = min(pos, len(self._ids) - 1)
+        # Floating point drift can land on a freed or zero-weight slot; step to a live one
+        while slot > 0 and (self._ids[slot] is None or self._weights[slot] == 0):
+            slot -= 1
+        if self._ids[slot] is None:
+            return self.sample_uniform(1, rng=rng)[0]
+        return self._ids[slot]
+
+    def sample_distinct(self, k, rng=random):
+        """
+        Up to `k` distinct word ids, each drawn with probability proportional to its
+        weight among the words not drawn yet.
+        """
+        chosen = []
+        drawn = {}  # word id -> weight, restored afterwards
+        try:
+            while len(chosen) < min(k, len(self._slots)):
+                word_id = self.sample(rng) if self.total() > 1e-9 else None
+                if word_id is None or word_id in drawn:
+                    # Only zero weights left: fill up uniformly
+                    chosen.extend(self.sample_uniform(k - len(chosen), exclude=set(drawn), rng=rng))
+                    break
+                drawn[word_id] = self.get_weight(word_id)
+                self.set_weight(word_id, 0.0)
+                chosen.append(word_id)
+        finally:
+            for word_id, weight in drawn.items():
+                self.set_weight(word_id, weight)
+        return chosen
+
+    def sample_uniform(self, k, exclude=(), rng=random):
+        """Up to `k` distinct word ids drawn uniformly, ignoring weights."""
+        live = len(self._slots) - sum(1 for word_id in set(exclude) if word_id in self._slots)
+        k = min(k, live)
+        chosen = set()
+        while len(chosen) < k:
+            word_id = self._ids[rng.randrange(len(self._ids))]
+            if word_id is not None and word_id not in exclude:
+                chosen.add(word_id)
+        return list(chosen)
+
+
+class PracticeIndex:
+    """
+    Thread-safe `WeightedSampler` over the whole `words` collection.
+
+    The index is built from `load_weights()` (an iterable of (word_id, weight)) the
+    first time it is needed, and again after `refresh_seconds` if that is set, which
+    picks up words written by other instances. The new sampler is loaded and built
+    without holding the lock and then swapped in, replaying the updates made
+    meanwhile, so answers and draws never wait for a refresh.
+    """
+
+    def __init__(self, load_weights, refresh_seconds=0):
+        self._load_weights = load_weights
+        self.refresh_seconds = refresh_seconds
+        self._sampler = WeightedSampler()
+        self._built_at = None
+        self._pending = None  # (word_id, weight or None for a removal) applied while a build runs
+        self._lock = threading.Lock()  # Guards the live sampler; held only briefly
+        self._build_lock = threading.Lock()  # One build at a time
+
+    def _stale(self):
+        return self._built_at is None or bool(
+            self.refresh_seconds and time.monotonic() - self._built_at > self.refresh_seconds)
+
+    def _ensure_built(self):
+        if not self._stale():
+            return
+        if self._built_at is None:
+            self._build_lock.acquire()  # Nothing to draw from yet: wait for the first build
+        elif not self._build_lock.acquire(blocking=False):
+            return  # Another thread is refreshing; keep using the current sampler
+        try:
+            if self._stale():
+                self._build()
+        finally:
+            self._build_lock.release()
+
+    def _build(self):
+        started = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        try:
+            sampler = WeightedSampler(self._load_weights())
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for word_id, weight in self._pending:
+                if weight is None:
+                    sampler.remove(word_id)
+                else:
+                    sampler.set_weight(word_id, weight)
+            self._pending = None
+            self._sampler = sampler
+            self._built_at = time.monotonic()
+        print(f"Practice index built with {len(sampler)} words in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    def _update(self, word_id, weight):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((word_id, weight))
+            if self._built_at is not None:
+                if weight is None:
+                    self._sampler.remove(word_id)
+                else:
+                    self._sampler.set_weight(word_id, weight)
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def set_weight(self, word_id, weight):
+        self._update(word_id, weight)
+
+    def remove(self, word_id):
+        self._update(word_id, None)
+
+    def sample(self):
+        self._ensure_built()
+        with self._lock:
+            return self._sampler.sample()
+
+    def sample_distinct(self, k):
+        self._ensure_built()
+        with self._lock:
+            return self._sampler.sample_distinct(k)
+
+    def sample_uniform(self, k, exclude=()):
+        self._ensure_built()
+        with self._lock:
+            return self._sampler.sample_uniform(k, exclude)
+
+    def __len__(self):
+        self._ensure_built()
+        with self._lock:
+            return len(self._sampler)
@@ -0,0 +1,152 @@
+"""
+Per-key deduplication of concurrent calls ("single flight").
+
+The first caller for a key runs the function; callers that arrive while it is
+still running wait for it and receive the same result (or exception) instead of
+repeating the work.
+"""
+
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by an arbitrary hashable key."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn):
+        """
+        Run `fn()` unless a call for `key` is already in flight, in which case wait
+        for that call instead. Returns (result, shared) where `shared` is True for
+        callers that reused another caller's result.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def do_many(self, keys, fn):
+        """
+        `do` for several keys with one call: `fn(claimed)` runs for the keys that have
+        no call in flight and returns {key: result} for them; callers of `do` for those
+        keys wait for it. The other keys wait for their own calls (after `fn`, so two
+        batches sharing keys cannot wait on each other). Returns ({key: result}, shared
+        keys); keys whose call raised are left out of the results.
+        """
+        claimed, followed = [], {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                call = self._calls.get(key)
+                if call is not None:
+                    call.waiters += 1
+                    self.followers += 1
+                    followed[key] = call
+                else:
+                    self._calls[key] = _Call()
+                    self.leaders += 1
+                    claimed.append(key)
+
+        results, error = {}, None
+        try:
+            if claimed:
+                results = dict(fn(claimed))
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                calls = [self._calls.pop(key) for key in claimed]
+            for key, call in zip(claimed, calls):
+                if error is not None:
+                    call.error = error
+                elif key in results:
+                    call.result = results[key]
+                else:
+                    call.error = RuntimeError(f"No result for {key!r}")
+                call.done.set()
+
+        for key, call in followed.items():
+            call.done.wait()
+            if call.error is None:
+                results[key] = call.result
+        return results, set(followed)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` for coroutines running on one event loop."""
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key, fn):
+        """Await `fn()` unless a call for `key` is already in flight. Returns (result, shared)."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.followers += 1
+            # shield() so a cancelled follower does not cancel the leader's call
+            return await asyncio.shield(future), True
+
+        self.leaders += 1
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # The leader's request went away; its followers still expect an answer
+            future.set_exception(RuntimeError(f"In-flight call for {key!r} was cancelled"))
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+    def in_flight(self):
+        return len(self._calls)
@@ -0,0 +1,96 @@
+"""
+Cold-start bookkeeping.
+
+`StartupTimer` records how long each phase of importing the app took, how long
+the lazily created clients took to initialize and when the first request
+arrived, for the startup report (`/api/startup`, `/metrics` and the log).
+`LazyClient` creates an expensive client on first use, exactly once, even when
+several threads ask for it at the same time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.phases = {}  # name -> seconds, in the order they were recorded
+        self.import_seconds = None
+        self.first_request_seconds = None
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.phases[name] = seconds
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def imported(self):
+        """Mark the end of the module import and log the phases."""
+        self.import_seconds = time.perf_counter() - self.started
+        phases = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.phases.items())
+        print(f"Startup: app imported in {self.import_seconds * 1000:.1f}ms ({phases})")
+
+    def request_received(self):
+        """Record the arrival of the first request (cheap no-op afterwards)."""
+        if self.first_request_seconds is not None:
+            return
+        with self._lock:
+            if self.first_request_seconds is None:
+                self.first_request_seconds = time.perf_counter() - self.started
+                print(f"Startup: first request received {self.first_request_seconds * 1000:.1f}ms after import started")
+
+    def report(self):
+        with self._lock:
+            return {
+                "import_seconds": self.import_seconds,
+                "first_request_seconds": self.first_request_seconds,
+                "phases": dict(self.phases),
+            }
+
+
+class LazyClient:
+    """
+    Holds a client created by `factory()` on the first `get()`. A factory that
+    raises or returns None is logged once and leaves the client as None, like a
+    failed eager initialization would.
+    """
+
+    def __init__(self, name, factory, timer=None):
+        self.name = name
+        self._factory = factory
+        self._timer = timer
+        self._client = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self):
+        return self._initialized
+
+    def get(self):
+        if self._initialized:
+            return self._client
+        with self._lock:
+            if not self._initialized:
+                started = time.perf_counter()
+                try:
+                    self._client = self._factory()
+                except Exception as e:
+                    print(f"Error initializing {self.name}: {e}")
+                    self._client = None
+                seconds = time.perf_counter() - started
+                if self._timer is not None:
+                    self._timer.record(f"{self.name} init", seconds)
+                if self._client is not None:
+                    print(f"{self.name} initialized in {seconds * 1000:.1f}ms")
+                self._initialized = True
+        return self._client
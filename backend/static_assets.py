@@ -0,0 +1,145 @@
+"""
+In-memory manifest of the frontend's static files.
+
+At startup every file under `css/` and `js/` is read once, fingerprinted with a
+content hash and precompressed (gzip, and brotli when the `brotli` package is
+installed). `index.html` is rewritten to reference the fingerprinted names, so
+those can be cached by browsers forever, while `index.html` itself is always
+revalidated with its ETag.
+
+Compressing with the highest brotli quality takes long enough to matter on a
+cold start, so the container image build runs scripts/precompress_static.py,
+which writes the compressed variants to a directory keyed by content hash.
+At startup those are read back; files missing from it (e.g. when running from
+a checkout) are compressed with a lower brotli quality.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # Optional: serve gzip only
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+MAX_BROTLI_QUALITY = 11
+# File extensions of the variants written by `AssetManifest.write_precompressed`
+PRECOMPRESSED_EXTENSIONS = {'gzip': 'gz', 'br': 'br'}
+
+
+def compress(data, encoding, brotli_quality=MAX_BROTLI_QUALITY):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=brotli_quality)
+
+
+class StaticAsset:
+    """One servable file with its precompressed variants."""
+
+    def __init__(self, data, content_type, cache_control, precompressed_dir=None, brotli_quality=MAX_BROTLI_QUALITY):
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.etag = self.digest[:16]
+        self.variants = {'identity': data}
+        for encoding in ('gzip', 'br') if brotli is not None else ('gzip',):
+            compressed = self._read_precompressed(precompressed_dir, encoding)
+            if compressed is None:
+                compressed = compress(data, encoding, brotli_quality)
+            if len(compressed) < len(data):
+                self.variants[encoding] = compressed
+
+    def precompressed_name(self, encoding):
+        return f"{self.digest}.{PRECOMPRESSED_EXTENSIONS[encoding]}"
+
+    def _read_precompressed(self, precompressed_dir, encoding):
+        if not precompressed_dir:
+            return None
+        try:
+            with open(os.path.join(precompressed_dir, self.precompressed_name(encoding)), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def choose_encoding(self, accept_encodings):
+        """Pick the smallest variant the client accepts (`accept_encodings` is a werkzeug Accept object)."""
+        candidates = [encoding for encoding in self.variants
+                      if encoding != 'identity' and accept_encodings[encoding] > 0]
+        if not candidates:
+            return 'identity'
+        return min(candidates, key=lambda encoding: len(self.variants[encoding]))
+
+
+class AssetManifest:
+    """Maps URL paths to `StaticAsset`s. Unknown paths resolve to index.html (SPA routing)."""
+
+    def __init__(self, root, asset_dirs=('css', 'js'), index='index.html', precompressed_dir=None,
+                 brotli_quality=MAX_BROTLI_QUALITY):
+        self.root = root
+        self.asset_dirs = asset_dirs
+        self.index_name = index
+        self.precompressed_dir = precompressed_dir
+        self.brotli_quality = brotli_quality
+        self.assets = {}
+        self.fingerprints = {}  # original path -> fingerprinted path
+
+    def build(self):
+        assets, fingerprints = {}, {}
+        for asset_dir in self.asset_dirs:
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, asset_dir)):
+                for filename in sorted(filenames):
+                    if filename.startswith('.'):
+                        continue
+                    full_path = os.path.join(dirpath, filename)
+                    path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                    with open(full_path, 'rb') as f:
+                        data = f.read()
+                    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                    stem, ext = os.path.splitext(path)
+                    fingerprinted = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+                    fingerprints[path] = fingerprinted
+                    assets[fingerprinted] = self._asset(data, content_type, IMMUTABLE_CACHE_CONTROL)
+                    # Keep the original name working for anything that still links to it
+                    assets[path] = self._asset(data, content_type, REVALIDATE_CACHE_CONTROL)
+
+        with open(os.path.join(self.root, self.index_name), 'r', encoding='utf-8') as f:
+            html = f.read()
+        html = re.sub(
+            r'((?:src|href)=["\'])([^"\']+)(["\'])',
+            lambda m: m.group(1) + fingerprints.get(m.group(2), m.group(2)) + m.group(3),
+            html
+        )
+        assets[self.index_name] = self._asset(html.encode('utf-8'), 'text/html; charset=utf-8', REVALIDATE_CACHE_CONTROL)
+
+        self.assets, self.fingerprints = assets, fingerprints
+        return self
+
+    def _asset(self, data, content_type, cache_control):
+        return StaticAsset(data, content_type, cache_control, self.precompressed_dir, self.brotli_quality)
+
+    def write_precompressed(self, directory):
+        """Write the compressed variants of every asset to `directory`. Returns the number of files written."""
+        os.makedirs(directory, exist_ok=True)
+        written = set()
+        for asset in self.assets.values():
+            for encoding, data in asset.variants.items():
+                name = asset.precompressed_name(encoding) if encoding != 'identity' else None
+                if name is None or name in written:
+                    continue
+                with open(os.path.join(directory, name), 'wb') as f:
+                    f.write(data)
+                written.add(name)
+        return len(written)
+
+    @property
+    def index(self):
+        return self.assets[self.index_name]
+
+    def resolve(self, path):
+        """Asset for a URL path, falling back to index.html for frontend routes."""
+        return self.assets.get((path or '').lstrip('/')) or self.index
@@ -0,0 +1,364 @@
+"""
+In-memory text indexes over the stored `english_word` values.
+
+`PrefixIndex` keeps a sorted array of index keys and answers prefix queries with
+`bisect`. Every token start of a word is indexed, so "puff" finds
+"huffing and puffing" as well as "puffin". Matches are ranked by `view_count`.
+One- and two-letter prefixes match too many words to rank them per query, so
+their matches are kept in lists already ordered by `view_count`.
+
+`TypoIndex` finds stored words within a small edit distance of a query
+(SymSpell: every word is indexed under the strings obtained by deleting up to
+`max_distance` characters, so a lookup only generates the deletes of the query
+and verifies the few candidates that share one).
+"""
+
+import bisect
+import heapq
+import re
+import threading
+import time
+
+_TOKEN_START = re.compile(r"(?:^|(?<=[\s\-/]))\S")
+
+
+def normalize_text(text):
+    """Lower-case and collapse whitespace, as used for index keys and queries."""
+    return " ".join(str(text).lower().split())
+
+
+def token_suffixes(text):
+    """The normalized text starting at each of its tokens ("a b c" -> "a b c", "b c", "c")."""
+    normalized = normalize_text(text)
+    return [normalized[match.start():] for match in _TOKEN_START.finditer(normalized)]
+
+
+def short_prefixes(keys, length):
+    """The prefixes of up to `length` characters of a word's index keys (its `token_suffixes`)."""
+    return {key[:n] for key in keys for n in range(1, min(length, len(key)) + 1)}
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, word_id) pairs, one per token start of every word, plus
+    for every prefix of up to SHORT_PREFIX characters the matching words ranked by
+    (-view_count, english_word, word_id).
+
+    The most viewed match is found even when it sorts after thousands of others:
+
+    >>> index = PrefixIndex()
+    >>> index.rebuild((f"w{i}", f"w{i}", i) for i in range(6000))
+    >>> index.add_views("w10", 10000)
+    >>> [word_id for word_id, _, _ in index.suggest("w", 2)]
+    ['w10', 'w5999']
+    >>> [word_id for word_id, _, _ in index.suggest("w59", 1)]
+    ['w5999']
+    """
+
+    SHORT_PREFIX = 2
+
+    def __init__(self):
+        self._keys = []  # sorted (key, word_id)
+        self._words = {}  # word_id -> [english_word, view_count]
+        self._ranked = {}  # short prefix -> sorted [(-view_count, english_word, word_id)]
+
+    def _rank(self, word_id):
+        english_word, view_count = self._words[word_id]
+        return (-view_count, english_word, word_id)
+
+    def _unrank(self, word_id):
+        rank = self._rank(word_id)
+        for prefix in short_prefixes(token_suffixes(rank[1]), self.SHORT_PREFIX):
+            ranked = self._ranked[prefix]
+            del ranked[bisect.bisect_left(ranked, rank)]
+            if not ranked:
+                del self._ranked[prefix]
+
+    def _insert_rank(self, word_id):
+        rank = self._rank(word_id)
+        for prefix in short_prefixes(token_suffixes(rank[1]), self.SHORT_PREFIX):
+            bisect.insort(self._ranked.setdefault(prefix, []), rank)
+
+    def rebuild(self, words):
+        """Replace the contents with `words`, an iterable of (word_id, english_word, view_count)."""
+        self._words = {word_id: [english_word, view_count or 0] for word_id, english_word, view_count in words}
+        keys, ranked = [], {}
+        for word_id, (english_word, view_count) in self._words.items():
+            suffixes = token_suffixes(english_word)
+            keys.extend((key, word_id) for key in suffixes)
+            rank = (-view_count, english_word, word_id)
+            for prefix in short_prefixes(suffixes, self.SHORT_PREFIX):
+                ranked.setdefault(prefix, []).append(rank)
+        keys.sort()
+        for entries in ranked.values():
+            entries.sort()
+        self._keys, self._ranked = keys, ranked
+
+    def add(self, word_id, english_word, view_count=0):
+        if word_id in self._words:
+            self.remove(word_id)
+        self._words[word_id] = [english_word, view_count or 0]
+        for key in token_suffixes(english_word):
+            bisect.insort(self._keys, (key, word_id))
+        self._insert_rank(word_id)
+
+    def remove(self, word_id):
+        if word_id not in self._words:
+            return
+        self._unrank(word_id)
+        entry = self._words.pop(word_id)
+        for key in token_suffixes(entry[0]):
+            position = bisect.bisect_left(self._keys, (key, word_id))
+            if position < len(self._keys) and self._keys[position] == (key, word_id):
+                del self._keys[position]
+
+    def add_views(self, word_id, count=1):
+        if word_id not in self._words:
+            return
+        self._unrank(word_id)
+        self._words[word_id][1] += count
+        self._insert_rank(word_id)
+
+    def suggest(self, query, k=10):
+        """Return up to `k` (word_id, english_word, view_count) whose tokens start with `query`, most viewed first."""
+        prefix = normalize_text(query)
+        if not prefix or k <= 0:
+            return []
+        if len(prefix) <= self.SHORT_PREFIX:
+            best = [word_id for _, _, word_id in self._ranked.get(prefix, [])[:k]]
+        else:
+            matches = set()
+            position = bisect.bisect_left(self._keys, (prefix,))
+            while position < len(self._keys) and self._keys[position][0].startswith(prefix):
+                matches.add(self._keys[position][1])
+                position += 1
+            best = [rank[2] for rank in heapq.nsmallest(k, map(self._rank, matches))]
+        return [(word_id, *self._words[word_id]) for word_id in best]
+
+    def view_count(self, word_id):
+        entry = self._words.get(word_id)
+        return entry[1] if entry is not None else 0
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word_id):
+        return word_id in self._words
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance (transpositions count as one edit), or max_distance + 1 if larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def deletes(word, max_distance):
+    """`word` and every string obtained by deleting up to `max_distance` characters from it."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+class TypoIndex:
+    """SymSpell-style index answering "which stored word did the user probably mean?"."""
+
+    # Edits tolerated for a query of at least this many characters. Shorter words
+    # are too likely to be different real words ("bread" / "break").
+    DISTANCE_BY_LENGTH = ((10, 2), (6, 1))
+
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self._deletes = {}  # delete -> set of normalized words
+        self._words = {}  # normalized word -> word_id
+
+    def allowed_distance(self, word):
+        for min_length, distance in self.DISTANCE_BY_LENGTH:
+            if len(word) >= min_length:
+                return min(distance, self.max_distance)
+        return 0
+
+    def rebuild(self, word_ids):
+        self._deletes = {}
+        self._words = {}
+        for word_id in word_ids:
+            self.add(word_id)
+
+    def add(self, word_id):
+        word = normalize_text(word_id)
+        if not word or self.max_distance <= 0:
+            return
+        self._words[word] = word_id
+        for candidate in deletes(word, self.max_distance):
+            self._deletes.setdefault(candidate, set()).add(word)
+
+    def remove(self, word_id):
+        word = normalize_text(word_id)
+        if self._words.pop(word, None) is None:
+            return
+        for candidate in deletes(word, self.max_distance):
+            words = self._deletes.get(candidate)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self._deletes[candidate]
+
+    def lookup(self, query):
+        """Return [(word_id, distance)] of stored words within the allowed distance of `query`, closest first."""
+        word = normalize_text(query)
+        max_distance = self.allowed_distance(word)
+        if max_distance == 0:
+            return [(self._words[word], 0)] if word in self._words else []
+        candidates = set()
+        for candidate in deletes(word, max_distance):
+            candidates |= self._deletes.get(candidate, set())
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((self._words[candidate], distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+    def __len__(self):
+        return len(self._words)
+
+
+class SuggestIndex:
+    """
+    Thread-safe `PrefixIndex` and `TypoIndex` over the whole `words` collection.
+
+    Built from `load_words()` (an iterable of (word_id, english_word, view_count)) by
+    `start()` in the background, or on first use, and again after `refresh_seconds`
+    if that is set. The collection is read and the new indexes built without holding
+    the lock, then swapped in; updates made meanwhile are replayed on them, so
+    searches never wait for a build. Only queries made before the first build wait.
+    """
+
+    def __init__(self, load_words, refresh_seconds=0, max_typo_distance=2):
+        self._load_words = load_words
+        self.refresh_seconds = refresh_seconds
+        self.max_typo_distance = max_typo_distance
+        self._index = PrefixIndex()
+        self._typos = TypoIndex(max_typo_distance)
+        self._built_at = None
+        self._pending = None  # (operation, args) applied while a build runs, replayed on the new indexes
+        self._lock = threading.Lock()  # Guards the live indexes; held only briefly
+        self._build_lock = threading.Lock()  # One build at a time
+
+    def _stale(self):
+        return self._built_at is None or bool(
+            self.refresh_seconds and time.monotonic() - self._built_at > self.refresh_seconds)
+
+    def _ensure_built(self):
+        if not self._stale():
+            return
+        if self._built_at is None:
+            self._build_lock.acquire()  # Nothing to answer from yet: wait for the first build
+        elif not self._build_lock.acquire(blocking=False):
+            return  # Another thread is refreshing; keep using the current indexes
+        try:
+            if self._stale():
+                self._build()
+        finally:
+            self._build_lock.release()
+
+    def _build(self):
+        started = time.perf_counter()
+        with self._lock:
+            self._pending = []
+        try:
+            words = list(self._load_words())
+            index = PrefixIndex()
+            index.rebuild(words)
+            typos = TypoIndex(self.max_typo_distance)
+            typos.rebuild(word_id for word_id, _, _ in words)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for operation, args in self._pending:
+                self._apply(index, typos, operation, args)
+            self._pending = None
+            self._index, self._typos = index, typos
+            self._built_at = time.monotonic()
+        print(f"Suggest index built with {len(index)} words in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    @staticmethod
+    def _apply(index, typos, operation, args):
+        if operation == 'add':
+            index.add(*args)
+            typos.add(args[0])
+        elif operation == 'remove':
+            index.remove(*args)
+            typos.remove(*args)
+        else:
+            index.add_views(*args)
+
+    def _update(self, operation, *args):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((operation, args))
+            if self._built_at is not None:
+                self._apply(self._index, self._typos, operation, args)
+
+    def start(self):
+        """Build the index in a background thread, so the first query does not pay for it."""
+        def build():
+            try:
+                self._ensure_built()
+            except Exception as e:
+                print(f"Error building suggest index: {e}")
+        threading.Thread(target=build, name='suggest-index-build', daemon=True).start()
+        return self
+
+    def build(self):
+        with self._build_lock:
+            self._build()
+
+    def add(self, word_id, english_word, view_count=0):
+        self._update('add', word_id, english_word, view_count)
+
+    def remove(self, word_id):
+        self._update('remove', word_id)
+
+    def add_views(self, word_id, count=1):
+        self._update('add_views', word_id, count)
+
+    def suggest(self, query, k=10):
+        self._ensure_built()
+        with self._lock:
+            return self._index.suggest(query, k)
+
+    def correct(self, query):
+        """
+        Return the word_id of the stored word closest to a misspelled `query`
+        (fewest edits, then most viewed), or None if there is none close enough.
+        """
+        self._ensure_built()
+        with self._lock:
+            matches = self._typos.lookup(query)
+            if not matches:
+                return None
+            views = {word_id: self._index.view_count(word_id) for word_id, _ in matches}
+            return min(matches, key=lambda match: (match[1], -views[match[0]], match[0]))[0]
+
+    def __len__(self):
+        self._ensure_built()
+        with self._lock:
+            return len(self._index)
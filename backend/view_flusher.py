@@ -0,0 +1,109 @@
+"""
+Write-behind coalescing of `view_count` / `last_viewed_at` updates.
+
+`/api/search` hits record a view here instead of writing to the store on the
+request path. A background thread collects the views per word and commits them
+as a single batched write every `interval_ms` milliseconds, or earlier once
+`max_pending` distinct words are waiting. Pending views are flushed on shutdown.
+"""
+
+import atexit
+import threading
+
+from word_store import SERVER_TIMESTAMP
+
+
+class ViewCountFlusher:
+    """Coalesces view increments per word and flushes them in batches."""
+
+    def __init__(self, store, interval_ms=1000, max_pending=500):
+        self.store = store
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending = {}  # word_id -> number of views since the last flush
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.views_recorded = 0
+        self.flushes = 0
+        self.documents_written = 0
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self._run, name='view-count-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        return self
+
+    @property
+    def running(self):
+        """False when views are written synchronously by `record`."""
+        return self._thread is not None
+
+    def record(self, word_id, count=1):
+        """Record `count` views of `word_id`. Written synchronously if the flusher is disabled."""
+        if self._thread is None:
+            self.store.increment(word_id, {"view_count": count}, {"last_viewed_at": SERVER_TIMESTAMP})
+            self.views_recorded += count
+            self.documents_written += 1
+            return
+        with self._lock:
+            self._pending[word_id] = self._pending.get(word_id, 0) + count
+            self.views_recorded += count
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def discard(self, word_id):
+        """Drop pending views of a word (e.g. because it was deleted)."""
+        with self._lock:
+            self._pending.pop(word_id, None)
+
+    def pending(self, word_id):
+        with self._lock:
+            return self._pending.get(word_id, 0)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            self.store.increment_many(
+                {word_id: {"view_count": count} for word_id, count in pending.items()},
+                {"last_viewed_at": SERVER_TIMESTAMP}
+            )
+            self.flushes += 1
+            self.documents_written += len(pending)
+        except Exception as e:
+            print(f"Error flushing view counts for {len(pending)} words: {e}")
+            # Put the views back so the next flush retries them
+            with self._lock:
+                for word_id, count in pending.items():
+                    self._pending[word_id] = self._pending.get(word_id, 0) + count
+
+    def stop(self):
+        """Stop the background thread and flush whatever is still pending."""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending_words": pending,
+            "views_recorded": self.views_recorded,
+            "flushes": self.flushes,
+            "documents_written": self.documents_written,
+        }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
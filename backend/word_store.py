@@ -0,0 +1,587 @@
+"""
+Storage backends for the `words` collection.
+
+`WordStore` is the interface used by the API endpoints. Two implementations are
+provided:
+
+- `FirestoreWordStore`: the production backend (Firestore `words` collection).
+- `SQLiteWordStore`: an embedded SQLite database (WAL mode, indexed) for small
+  deployments, benchmarks and offline development.
+
+Documents are plain dicts keyed by the lower-cased English word. Use the
+`SERVER_TIMESTAMP` sentinel for fields that should be stamped by the backend.
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+class _ServerTimestamp:
+    """Sentinel replaced by the backend's notion of 'now' when written."""
+
+    def __repr__(self):
+        return "SERVER_TIMESTAMP"
+
+
+SERVER_TIMESTAMP = _ServerTimestamp()
+
+DEFAULT_PRACTICE_WEIGHT = 10
+
+
+class WordNotFoundError(KeyError):
+    """Raised when updating a document that does not exist."""
+
+
+class WordStore:
+    """Interface for the operations the API needs on the `words` collection."""
+
+    def get(self, word_id):
+        """Return the document for `word_id` as a dict, or None if it does not exist."""
+        raise NotImplementedError
+
+    def get_many(self, word_ids):
+        """Return {word_id: document} for the ids that exist."""
+        docs = {}
+        for word_id in word_ids:
+            doc = self.get(word_id)
+            if doc is not None:
+                docs[word_id] = doc
+        return docs
+
+    def set(self, word_id, data):
+        """Create or overwrite the document for `word_id`."""
+        raise NotImplementedError
+
+    def set_many(self, docs_by_id):
+        """Create or overwrite many documents ({word_id: data})."""
+        for word_id, data in docs_by_id.items():
+            self.set(word_id, data)
+
+    def update(self, word_id, fields):
+        """Update fields of an existing document."""
+        raise NotImplementedError
+
+    def increment(self, word_id, counters, fields=None):
+        """Atomically add `counters` ({field: amount}) and set `fields` on a document."""
+        raise NotImplementedError
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        """
+        Apply `increment` to many documents ({word_id: {field: amount}}), setting the
+        same `fields` on each, plus the document's own entry of `fields_by_id`.
+        Documents that no longer exist are skipped.
+        """
+        for word_id, counters in counters_by_id.items():
+            try:
+                self.increment(word_id, counters, _document_fields(fields, fields_by_id, word_id))
+            except WordNotFoundError:
+                pass
+
+    def delete(self, word_id):
+        """Delete a document. Returns True if it existed."""
+        raise NotImplementedError
+
+    def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        """
+        Iterate over (word_id, document) ordered by `order_by` (then by id). `start_after` is
+        the id of the last document of the previous page; `fields` restricts the
+        fields that are read. Raises ValueError for an unknown cursor.
+        """
+        raise NotImplementedError
+
+    def list_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        """Return documents ordered by `order_by`."""
+        return [doc for _, doc in self.iter_words(order_by, descending, limit, start_after, fields)]
+
+    def list_weights(self, weight_field='practice_weight', default_weight=DEFAULT_PRACTICE_WEIGHT, where=None):
+        """
+        Return (word_id, weight) for every document, reading only the weight field.
+        `where` ({field: value}) restricts the result to documents with those values,
+        filtered by the backend's index.
+        """
+        raise NotImplementedError
+
+
+def _document_fields(fields, fields_by_id, word_id):
+    """The fields `increment_many` sets on one document."""
+    if not fields_by_id or word_id not in fields_by_id:
+        return fields
+    return {**(fields or {}), **fields_by_id[word_id]}
+
+
+class FirestoreWordStore(WordStore):
+    """`WordStore` backed by a Firestore collection."""
+
+    MAX_BATCH_SIZE = 500  # Firestore limit of writes per batch
+
+    def __init__(self, client, collection='words'):
+        from google.cloud import firestore
+        from google.api_core import exceptions
+        self._firestore = firestore
+        self._not_found = exceptions.NotFound
+        self._client = client
+        self._collection = client.collection(collection)
+
+    def _convert(self, data):
+        return {
+            key: self._firestore.SERVER_TIMESTAMP if value is SERVER_TIMESTAMP else value
+            for key, value in data.items()
+        }
+
+    def get(self, word_id):
+        doc = self._collection.document(word_id).get()
+        return doc.to_dict() if doc.exists else None
+
+    def get_many(self, word_ids):
+        refs = [self._collection.document(word_id) for word_id in word_ids]
+        if not refs:
+            return {}
+        # A single multi-document read instead of one round trip per word
+        return {doc.id: doc.to_dict() for doc in self._client.get_all(refs) if doc.exists}
+
+    def set(self, word_id, data):
+        self._collection.document(word_id).set(self._convert(data))
+
+    def set_many(self, docs_by_id):
+        items = list(docs_by_id.items())
+        for start in range(0, len(items), self.MAX_BATCH_SIZE):
+            batch = self._client.batch()
+            for word_id, data in items[start:start + self.MAX_BATCH_SIZE]:
+                batch.set(self._collection.document(word_id), self._convert(data))
+            batch.commit()
+
+    def update(self, word_id, fields):
+        self._collection.document(word_id).update(self._convert(fields))
+
+    def _increment_fields(self, counters, fields):
+        update_fields = {key: self._firestore.Increment(amount) for key, amount in counters.items()}
+        update_fields.update(self._convert(fields or {}))
+        return update_fields
+
+    def increment(self, word_id, counters, fields=None):
+        try:
+            self._collection.document(word_id).update(self._increment_fields(counters, fields))
+        except self._not_found as e:
+            raise WordNotFoundError(word_id) from e
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        items = list(counters_by_id.items())
+        for start in range(0, len(items), self.MAX_BATCH_SIZE):
+            chunk = items[start:start + self.MAX_BATCH_SIZE]
+            batch = self._client.batch()
+            for word_id, counters in chunk:
+                batch.update(self._collection.document(word_id),
+                             self._increment_fields(counters, _document_fields(fields, fields_by_id, word_id)))
+            try:
+                batch.commit()
+            except self._not_found:
+                # A document was deleted since it was viewed; the whole batch is
+                # rejected, so retry one by one and skip the missing ones.
+                super().increment_many(dict(chunk), fields, fields_by_id)
+
+    def delete(self, word_id):
+        word_ref = self._collection.document(word_id)
+        if not word_ref.get().exists:
+            return False
+        word_ref.delete()
+        return True
+
+    def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        query = self._collection
+        if order_by:
+            direction = self._firestore.Query.DESCENDING if descending else self._firestore.Query.ASCENDING
+            query = query.order_by(order_by, direction=direction)
+        if fields:
+            query = query.select(list(fields))
+        if start_after:
+            cursor = self._collection.document(start_after).get()
+            if not cursor.exists:
+                raise ValueError(f"Unknown cursor '{start_after}'")
+            query = query.start_after(cursor)
+        if limit:
+            query = query.limit(limit)
+        return ((doc.id, doc.to_dict()) for doc in query.stream())
+
+    def list_weights(self, weight_field='practice_weight', default_weight=DEFAULT_PRACTICE_WEIGHT, where=None):
+        query = self._collection
+        for field, value in (where or {}).items():
+            # Single-field equality filters are served by Firestore's automatic indexes
+            query = query.where(filter=self._firestore.FieldFilter(field, '==', value))
+        weights = []
+        for doc in query.select([weight_field]).stream():
+            weight = (doc.to_dict() or {}).get(weight_field)
+            weights.append((doc.id, default_weight if weight is None else weight))
+        return weights
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _format_timestamp(value):
+    # Fixed-width format so that timestamps sort correctly as text.
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def _parse_timestamp(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo=timezone.utc)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return _format_timestamp(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SQLiteWordStore(WordStore):
+    """
+    `WordStore` backed by an embedded SQLite database.
+
+    Frequently queried fields live in their own (indexed) columns; everything else
+    is kept as JSON in the `data` column. Each thread gets its own connection, and
+    the database runs in WAL mode so readers never block on the writer.
+    """
+
+    COLUMNS = (
+        'english_word',
+        'view_count',
+        'practice_weight',
+        'practice_correct_count',
+        'practice_incorrect_count',
+        'created_at',
+        'last_viewed_at',
+        'is_practicable',
+    )
+    TIMESTAMP_COLUMNS = ('created_at', 'last_viewed_at')
+    BOOLEAN_COLUMNS = ('is_practicable',)
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS words (
+                    id TEXT PRIMARY KEY,
+                    english_word TEXT,
+                    view_count INTEGER,
+                    practice_weight NUMERIC,
+                    practice_correct_count INTEGER,
+                    practice_incorrect_count INTEGER,
+                    created_at TEXT,
+                    last_viewed_at TEXT,
+                    is_practicable INTEGER,
+                    data TEXT NOT NULL DEFAULT '{}'
+                )
+            """)
+            existing = {row['name'] for row in conn.execute("PRAGMA table_info(words)")}
+            if 'is_practicable' not in existing:  # Databases created before the column existed
+                conn.execute("ALTER TABLE words ADD COLUMN is_practicable INTEGER")
+            conn.execute("DROP INDEX IF EXISTS idx_words_created_at")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_words_created_at_id ON words(created_at, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_words_last_viewed_at ON words(last_viewed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_words_is_practicable ON words(is_practicable)")
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _to_db_value(self, key, value, now):
+        if value is SERVER_TIMESTAMP:
+            value = now
+        if key in self.TIMESTAMP_COLUMNS and isinstance(value, datetime):
+            return _format_timestamp(value)
+        return value
+
+    def _split(self, data, now):
+        columns, extra = {}, {}
+        for key, value in data.items():
+            if key in self.COLUMNS:
+                columns[key] = self._to_db_value(key, value, now)
+            else:
+                extra[key] = _format_timestamp(now) if value is SERVER_TIMESTAMP else value
+        return columns, extra
+
+    def _row_to_dict(self, row):
+        data = json.loads(row['data'])
+        for key in self.COLUMNS:
+            value = row[key]
+            if value is None:
+                continue
+            if key in self.TIMESTAMP_COLUMNS:
+                value = _parse_timestamp(value)
+            elif key in self.BOOLEAN_COLUMNS:
+                value = bool(value)
+            data[key] = value
+        return data
+
+    def get(self, word_id):
+        row = self._conn().execute("SELECT * FROM words WHERE id = ?", (word_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def get_many(self, word_ids):
+        word_ids = list(word_ids)
+        docs = {}
+        # Stay well below SQLite's limit on the number of bound parameters
+        for start in range(0, len(word_ids), 500):
+            chunk = word_ids[start:start + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            rows = self._conn().execute(f"SELECT * FROM words WHERE id IN ({placeholders})", chunk)
+            docs.update((row['id'], self._row_to_dict(row)) for row in rows)
+        return docs
+
+    def _insert(self, conn, word_id, data, now):
+        columns, extra = self._split(data, now)
+        names = ['id', *columns, 'data']
+        values = [word_id, *columns.values(), json.dumps(extra, default=_json_default)]
+        placeholders = ', '.join('?' for _ in names)
+        conn.execute(f"INSERT OR REPLACE INTO words ({', '.join(names)}) VALUES ({placeholders})", values)
+
+    def set(self, word_id, data):
+        self._insert(self._conn(), word_id, data, _utcnow())
+
+    def set_many(self, docs_by_id):
+        now = _utcnow()
+        with self._transaction() as conn:
+            for word_id, data in docs_by_id.items():
+                self._insert(conn, word_id, data, now)
+
+    def update(self, word_id, fields):
+        self.increment(word_id, {}, fields)
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _apply_increment(self, conn, word_id, counters, fields, now):
+        columns, extra = self._split(fields or {}, now)
+        assignments, values = [], []
+        for key, amount in counters.items():
+            if key in self.COLUMNS:
+                assignments.append(f"{key} = COALESCE({key}, 0) + ?")
+                values.append(amount)
+        for key, value in columns.items():
+            assignments.append(f"{key} = ?")
+            values.append(value)
+        json_counters = {key: amount for key, amount in counters.items() if key not in self.COLUMNS}
+
+        row = conn.execute("SELECT data FROM words WHERE id = ?", (word_id,)).fetchone()
+        if row is None:
+            raise WordNotFoundError(word_id)
+        if extra or json_counters:
+            data = json.loads(row['data'])
+            data.update(extra)
+            for key, amount in json_counters.items():
+                data[key] = data.get(key, 0) + amount
+            assignments.append("data = ?")
+            values.append(json.dumps(data, default=_json_default))
+        if assignments:
+            conn.execute(f"UPDATE words SET {', '.join(assignments)} WHERE id = ?", (*values, word_id))
+
+    def increment(self, word_id, counters, fields=None):
+        with self._transaction() as conn:
+            self._apply_increment(conn, word_id, counters, fields, _utcnow())
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        now = _utcnow()
+        with self._transaction() as conn:
+            for word_id, counters in counters_by_id.items():
+                try:
+                    self._apply_increment(conn, word_id, counters, _document_fields(fields, fields_by_id, word_id), now)
+                except WordNotFoundError:
+                    pass
+
+    def delete(self, word_id):
+        cursor = self._conn().execute("DELETE FROM words WHERE id = ?", (word_id,))
+        return cursor.rowcount > 0
+
+    def iter_words(self, order_by='created_at', descending=True, limit=None, start_after=None, fields=None):
+        if order_by and order_by not in self.COLUMNS:
+            raise ValueError(f"Cannot order by '{order_by}'")
+        conn = self._conn()
+        descending = bool(descending and order_by)
+        direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+        cursor_value = None
+        if start_after:
+            cursor = conn.execute(f"SELECT {order_by or 'id'} FROM words WHERE id = ?", (start_after,)).fetchone()
+            if cursor is None:
+                raise ValueError(f"Unknown cursor '{start_after}'")
+            cursor_value = cursor[0]
+
+        # (filter, keyset condition after the cursor, its parameters), in reading order
+        if order_by:
+            # SQLite sorts NULLs first ascending and last descending, but a NULL never satisfies
+            # the keyset comparison: rows without the field are read by a second query, on id only
+            present = (f"{order_by} IS NOT NULL", f"({order_by}, id) {comparison} (?, ?)", [cursor_value, start_after])
+            missing = (f"{order_by} IS NULL", f"id {comparison} ?", [start_after])
+            segments = [present, missing] if descending else [missing, present]
+            if start_after:
+                # Continue within the cursor's segment; the ones before it were read already
+                segments = segments[segments.index(missing if cursor_value is None else present):]
+        else:
+            segments = [("1", f"id {comparison} ?", [start_after])]
+        queries = [(f"{where} AND {keyset}", params) if start_after and index == 0 else (where, [])
+                   for index, (where, keyset, params) in enumerate(segments)]
+        order = ', '.join(f"{key} {direction}" for key in ([order_by, 'id'] if order_by else ['id']))
+
+        def rows():
+            remaining = limit
+            for where, params in queries:
+                sql = f"SELECT * FROM words WHERE {where} ORDER BY {order}"
+                if remaining:
+                    sql += f" LIMIT {int(remaining)}"
+                for row in conn.execute(sql, params):
+                    yield row
+                    if remaining:
+                        remaining -= 1
+                if limit and not remaining:
+                    return
+        return ((row['id'], self._project(self._row_to_dict(row), fields)) for row in rows())
+
+    @staticmethod
+    def _project(doc, fields):
+        if not fields:
+            return doc
+        return {key: value for key, value in doc.items() if key in fields}
+
+    def list_weights(self, weight_field='practice_weight', default_weight=DEFAULT_PRACTICE_WEIGHT, where=None):
+        if weight_field not in self.COLUMNS:
+            raise ValueError(f"Cannot read weights from '{weight_field}'")
+        sql, params = f"SELECT id, COALESCE({weight_field}, ?) FROM words", [default_weight]
+        if where:
+            for field in where:
+                if field not in self.COLUMNS:
+                    raise ValueError(f"Cannot filter on '{field}'")
+            sql += " WHERE " + " AND ".join(f"{field} = ?" for field in where)
+            params.extend(where.values())
+        rows = self._conn().execute(sql, params)
+        return [(word_id, weight) for word_id, weight in rows]
+
+
+class ChangeTrackingWordStore(WordStore):
+    """
+    Wraps another `WordStore` and counts the writes made through it, so callers can
+    tell cheaply whether anything may have changed (e.g. for ETags).
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def mark_changed(self):
+        with self._lock:
+            self.version += 1
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def get(self, word_id):
+        return self.inner.get(word_id)
+
+    def get_many(self, word_ids):
+        return self.inner.get_many(word_ids)
+
+    def iter_words(self, *args, **kwargs):
+        return self.inner.iter_words(*args, **kwargs)
+
+    def list_weights(self, *args, **kwargs):
+        return self.inner.list_weights(*args, **kwargs)
+
+    def set(self, word_id, data):
+        self.inner.set(word_id, data)
+        self.mark_changed()
+
+    def set_many(self, docs_by_id):
+        self.inner.set_many(docs_by_id)
+        self.mark_changed()
+
+    def update(self, word_id, fields):
+        self.inner.update(word_id, fields)
+        self.mark_changed()
+
+    def increment(self, word_id, counters, fields=None):
+        self.inner.increment(word_id, counters, fields)
+        self.mark_changed()
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        self.inner.increment_many(counters_by_id, fields, fields_by_id)
+        self.mark_changed()
+
+    def delete(self, word_id):
+        deleted = self.inner.delete(word_id)
+        self.mark_changed()
+        return deleted
+
+
+class LazyWordStore(WordStore):
+    """
+    Creates the wrapped store with `factory()` on first use, so importing the app
+    does not pay for client libraries and connections. `factory` may return None
+    (e.g. the client could not be created), in which case every call raises.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._inner = None
+        self._lock = threading.Lock()
+
+    @property
+    def inner(self):
+        if self._inner is None:
+            with self._lock:
+                if self._inner is None:
+                    inner = self._factory()
+                    if inner is None:
+                        raise RuntimeError("Word store is not available")
+                    self._inner = inner
+        return self._inner
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def get(self, word_id):
+        return self.inner.get(word_id)
+
+    def get_many(self, word_ids):
+        return self.inner.get_many(word_ids)
+
+    def iter_words(self, *args, **kwargs):
+        return self.inner.iter_words(*args, **kwargs)
+
+    def list_weights(self, *args, **kwargs):
+        return self.inner.list_weights(*args, **kwargs)
+
+    def set(self, word_id, data):
+        self.inner.set(word_id, data)
+
+    def set_many(self, docs_by_id):
+        self.inner.set_many(docs_by_id)
+
+    def update(self, word_id, fields):
+        self.inner.update(word_id, fields)
+
+    def increment(self, word_id, counters, fields=None):
+        self.inner.increment(word_id, counters, fields)
+
+    def increment_many(self, counters_by_id, fields=None, fields_by_id=None):
+        self.inner.increment_many(counters_by_id, fields, fields_by_id)
+
+    def delete(self, word_id):
+        return self.inner.delete(word_id)
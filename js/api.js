@@ -1,14 +1,14 @@
 // Base URL for your backend API - Using relative path for seamless deployment
 const BASE_URL = '/api'; // Changed from absolute URL to relative path
 
-async function searchWord(word) {
+async function searchWord(word, exact = false) {
     try {
         const response = await fetch(`${BASE_URL}/search`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({ word: word }),
+            body: JSON.stringify({ word: word, exact: exact }),
         });
         if (!response.ok) {
             const errorData = await response.json();
@@ -21,20 +21,46 @@ async function searchWord(word) {
     }
 }
 
-async function getWordList() {
+// Only the columns shown in the word list table
+const WORD_LIST_FIELDS = [
+    'english_word', 'definition', 'translation', 'view_count',
+    'practice_correct_count', 'practice_incorrect_count', 'practice_weight',
+    'created_at', 'last_viewed_at'
+].join(',');
+const WORD_LIST_PAGE_SIZE = 100;
+
+// One page of the word list, newest first; pass the returned nextCursor to get the next page
+async function getWordListPage(startAfter = null) {
     try {
-        const response = await fetch(`${BASE_URL}/words`);
+        let url = `${BASE_URL}/words?fields=${WORD_LIST_FIELDS}&limit=${WORD_LIST_PAGE_SIZE}`;
+        if (startAfter) {
+            url += `&start_after=${encodeURIComponent(startAfter)}`;
+        }
+        const response = await fetch(url);
         if (!response.ok) {
             const errorData = await response.json();
             throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
         }
-        return await response.json();
+        return { words: await response.json(), nextCursor: response.headers.get('X-Next-Cursor') };
     } catch (error) {
         console.error("Error getting word list:", error);
         throw error;
     }
 }
 
+async function getSuggestions(query) {
+    try {
+        const response = await fetch(`${BASE_URL}/suggest?q=${encodeURIComponent(query)}`);
+        if (!response.ok) {
+            return [];
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Error getting suggestions:", error);
+        return [];
+    }
+}
+
 async function getPracticeQuestion() {
     try {
         const response = await fetch(`${BASE_URL}/practice`);
@@ -49,6 +75,42 @@ async function getPracticeQuestion() {
     }
 }
 
+async function getPracticeSession(n) {
+    try {
+        const response = await fetch(`${BASE_URL}/practice/session?n=${n}`);
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Error getting practice session:", error);
+        throw error;
+    }
+}
+
+// keepalive lets the request finish while the page is being closed
+async function submitPracticeAnswers(answers, keepalive = false) {
+    try {
+        const response = await fetch(`${BASE_URL}/answer/batch`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ answers: answers }),
+            keepalive: keepalive,
+        });
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Error submitting answers:", error);
+        throw error;
+    }
+}
+
 async function submitPracticeAnswer(word, is_correct) {
     try {
         const response = await fetch(`${BASE_URL}/answer`, {
@@ -79,8 +141,7 @@ async function deleteWord(word) {
             throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
         }
         // Refresh the word list after successful deletion
-        const words = await getWordList();
-        displayWordList(words);
+        await loadWordList();
     } catch (error) {
         console.error("Error deleting word:", error);
         throw error;
@@ -14,6 +14,9 @@ const viewPracticeButton = document.getElementById('view-practice');
 
 // --- App State ---
 let currentPracticeQuestion = null;
+const PRACTICE_SESSION_SIZE = 10;
+let practiceQuestions = []; // Questions of the current session not shown yet
+let pendingAnswers = [];    // Answers not sent to the backend yet
 
 // --- URL Parameter Handling ---
 function getQueryParam(param) {
@@ -57,13 +60,30 @@ document.getElementById('search-input').addEventListener('keypress', (e) => {
     }
 });
 
+// Autocomplete saved words while typing
+let suggestTimer = null;
+document.getElementById('search-input').addEventListener('input', (e) => {
+    clearTimeout(suggestTimer);
+    const query = e.target.value.trim();
+    suggestTimer = setTimeout(async () => {
+        const suggestions = query ? await getSuggestions(query) : [];
+        const datalist = document.getElementById('search-suggestions');
+        datalist.innerHTML = '';
+        suggestions.forEach((suggestion) => {
+            const option = document.createElement('option');
+            option.value = suggestion.english_word;
+            datalist.appendChild(option);
+        });
+    }, 150);
+});
+
 // Navigation event listeners
 document.getElementById('view-search').addEventListener('click', () => showView('search-view'));
 document.getElementById('view-list').addEventListener('click', async () => {
     showView('list-view');
     try {
-        const words = await getWordList();
-        displayWordList(words);
+        await flushPracticeAnswers(); // So the list shows up-to-date practice stats
+        await loadWordList();
     } catch (error) {
         document.getElementById('word-list-tbody').innerHTML = `
             <tr><td colspan="6" class="px-6 py-4 text-center text-app-red">
@@ -71,6 +91,16 @@ document.getElementById('view-list').addEventListener('click', async () => {
             </td></tr>`;
     }
 });
+document.getElementById('word-list-more').addEventListener('click', async () => {
+    try {
+        await loadWordList(true);
+    } catch (error) {
+        document.getElementById('word-list-tbody').insertAdjacentHTML('beforeend', `
+            <tr><td colspan="6" class="px-6 py-4 text-center text-app-red">
+                Error loading more words: ${error.message}
+            </td></tr>`);
+    }
+});
 document.getElementById('view-practice').addEventListener('click', () => {
     showView('practice-view');
     loadPracticeQuestion();
@@ -130,8 +160,20 @@ function displaySearchResults(data) {
         `;
     }
 
+    // The backend matched a stored word close to what was typed
+    let correctionHTML = '';
+    if (data.corrected_from) {
+        correctionHTML = `
+            <p class="text-sm text-app-text-secondary">
+                Showing results for <span class="text-app-text-primary">${data.english_word}</span>.
+                <a href="#" id="search-exact" class="text-app-accent hover:underline">Search for "${data.corrected_from}" instead</a>
+            </p>
+        `;
+    }
+
     resultsDiv.innerHTML = `
         <div class="space-y-4">
+            ${correctionHTML}
             <div class="flex items-start justify-between">
                 <h3 class="text-xl font-medium text-app-accent">${data.english_word}</h3>
                 <span class="text-sm text-app-text-secondary">Views: ${data.view_count || 0}</span>
@@ -150,13 +192,37 @@ function displaySearchResults(data) {
             </div>
         </div>
     `;
+
+    const searchExactLink = document.getElementById('search-exact');
+    if (searchExactLink) {
+        searchExactLink.addEventListener('click', async (e) => {
+            e.preventDefault();
+            try {
+                displaySearchResults(await searchWord(data.corrected_from, true));
+            } catch (error) {
+                resultsDiv.innerHTML = `<div class="text-app-red">Error: ${error.message}</div>`;
+            }
+        });
+    }
+}
+
+let wordListCursor = null; // Id of the last word shown, while more pages are available
+
+// Show the first page of the word list, or with more=true append the next one
+async function loadWordList(more = false) {
+    const page = await getWordListPage(more ? wordListCursor : null);
+    wordListCursor = page.nextCursor;
+    displayWordList(page.words, more);
+    document.getElementById('word-list-more').classList.toggle('hidden', !wordListCursor);
 }
 
-function displayWordList(words) {
+function displayWordList(words, append = false) {
     const tbody = document.getElementById('word-list-tbody');
-    tbody.innerHTML = ''; // Clear existing content
+    if (!append) {
+        tbody.innerHTML = ''; // Clear existing content
+    }
 
-    if (!words || words.length === 0) {
+    if (!append && (!words || words.length === 0)) {
         tbody.innerHTML = `
             <tr>
                 <td colspan="9" class="px-6 py-4 text-center text-app-text-secondary">
@@ -261,9 +327,32 @@ function formatFirestoreTimestamp(timestamp) {
     }
 }
 
+// Send the buffered answers in one request; they are kept for a retry if it fails
+async function flushPracticeAnswers(keepalive = false) {
+    if (pendingAnswers.length === 0) return;
+    const answers = pendingAnswers;
+    pendingAnswers = [];
+    try {
+        await submitPracticeAnswers(answers, keepalive);
+    } catch (error) {
+        pendingAnswers = answers.concat(pendingAnswers);
+    }
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') {
+        flushPracticeAnswers(true);
+    }
+});
+
 async function loadPracticeQuestion() {
     try {
-        currentPracticeQuestion = await getPracticeQuestion();
+        if (practiceQuestions.length === 0) {
+            // New session: record the previous answers first, so their weights affect the draw
+            await flushPracticeAnswers();
+            practiceQuestions = (await getPracticeSession(PRACTICE_SESSION_SIZE)).questions;
+        }
+        currentPracticeQuestion = practiceQuestions.shift();
         if (!currentPracticeQuestion) {
             practiceModeDiv.innerHTML = '<p>No questions available.</p>';
             return;
@@ -297,17 +386,12 @@ function displayPracticeQuestion(question) {
 }
 
 async function handlePracticeAnswer(selectedOption) {
-    const feedbackP = document.getElementById('practice-feedback');
     if (!currentPracticeQuestion) return;
 
     const isCorrect = selectedOption === currentPracticeQuestion.correct_definition;
-    try {
-        await submitPracticeAnswer(currentPracticeQuestion.english_word, isCorrect);
-        showPracticeFeedback(isCorrect, currentPracticeQuestion.correct_definition);
-    } catch (error) {
-        feedbackP.textContent = `Error submitting answer: ${error.message}`;
-        feedbackP.className = 'error';
-    }
+    // Answers are sent in batches, when the session runs out or the page is hidden
+    pendingAnswers.push({ word: currentPracticeQuestion.english_word, is_correct: isCorrect });
+    showPracticeFeedback(isCorrect, currentPracticeQuestion.correct_definition);
 }
 
 function showPracticeFeedback(isCorrect, correctDefinition) {
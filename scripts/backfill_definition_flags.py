@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+One-time backfill of the definition quality fields (`is_practicable`,
+`definition_length_bucket`) on words stored before they were written with every
+new word. Practice mode only reads words flagged is_practicable, so run this once
+after upgrading an existing store.
+
+The collection is read page by page, reading only the fields involved, and the
+documents whose flags are missing or stale are updated with one batched write
+per page. Running it again only rewrites documents that changed in between.
+
+Usage:
+    python scripts/backfill_definition_flags.py [--dry-run]
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import main
+from snapshot import PAGE_SIZE, iter_pages
+
+FIELDS = ["definition", "is_practicable", "definition_length_bucket"]
+
+
+def backfill(store, page_size=PAGE_SIZE, dry_run=False):
+    """Update the documents with missing or stale flags. Returns (documents read, documents updated)."""
+    read, updated = 0, 0
+    for page in iter_pages(store, page_size, fields=FIELDS):
+        fields_by_id = {}
+        for word_id, doc in page:
+            flags = main.definition_flags(doc.get("definition"))
+            if any(doc.get(key) != value for key, value in flags.items()):
+                fields_by_id[word_id] = flags
+        if fields_by_id and not dry_run:
+            store.increment_many({word_id: {} for word_id in fields_by_id}, fields_by_id=fields_by_id)
+        read += len(page)
+        updated += len(fields_by_id)
+        print(f"Checked {read} documents, {updated} to update...", end="\r", flush=True)
+    print()
+    return read, updated
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Backfill is_practicable and definition_length_bucket on stored words.")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Documents read and updated per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the documents that need an update")
+    args = parser.parse_args()
+
+    if not main.store:
+        print("Error: word store not initialized.")
+        sys.exit(1)
+    read, updated = backfill(main.store, args.page_size, args.dry_run)
+    print(f"{'Would update' if args.dry_run else 'Updated'} {updated} of {read} documents.")
+
+
+if __name__ == "__main__":
+    main_cli()
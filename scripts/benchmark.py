@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Offline load test of the backend. The Flask app is imported with Firestore and
+Gemini replaced by the in-memory fakes in fake_services.py (so the real
+FirestoreWordStore code path is exercised), seeded with words from words.txt
+(or with the documents of a scripts/snapshot.py export, --snapshot), and driven
+in-process by a pool of worker threads.
+
+The default workload mixes search hits and misses, suggestions, practice
+sessions and batched answers (what the UI sends), single practice questions and
+answers (other API clients) and word-list reads (see --mix). With --replay, requests are taken from a
+JSONL request log instead, one {"method", "path", "json"} object per line.
+Latency percentiles and requests per second are reported per endpoint;
+--baseline compares p95 latencies with an earlier --json-output file and exits
+with status 1 on a regression.
+
+Usage:
+    python scripts/benchmark.py --requests 5000 --concurrency 8 --gemini-latency-ms 300
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_services import FakeFirestoreClient, FakeGeminiClient, fake_word_entry
+from search_words import WORDS_FILE, percentile, read_words_from_file
+from snapshot import import_snapshot
+
+# The UI fetches 10 practice questions per session and sends their answers in one batch
+DEFAULT_MIX = ("search_hit=45,search_miss=5,suggest=10,practice_session=8,answer_batch=8,"
+               "practice=5,answer=5,words=5")
+WORD_LIST_FIELDS = ("english_word,definition,translation,view_count,practice_correct_count,"
+                    "practice_incorrect_count,practice_weight,created_at,last_viewed_at")
+
+
+def load_app(args):
+    """Import backend/main.py with the Google clients replaced by the fakes."""
+    from google.cloud import firestore
+    from google.oauth2 import service_account
+    from google import genai
+
+    firestore_client = FakeFirestoreClient(latency_ms=args.firestore_latency_ms)
+    gemini_client = FakeGeminiClient(latency_ms=args.gemini_latency_ms, failure_rate=args.gemini_failure_rate,
+                                     seed=args.seed)
+    firestore.Client = lambda *a, **kw: firestore_client
+    service_account.Credentials.from_service_account_info = lambda info: SimpleNamespace(project_id="benchmark")
+    genai.Client = lambda *a, **kw: gemini_client
+
+    os.environ.update({
+        "WORD_STORE": "firestore",
+        "GOOGLE_SERVICE_ACCOUNT_JSON": "{}",
+        "GEMINI_API_KEY": "benchmark",
+        "LLM_CACHE_PATH": args.llm_cache or "",
+    })
+    import main
+    return main, firestore_client, gemini_client
+
+
+def seed_store(main, words):
+    docs = {word.lower(): main.build_word_document(word, main.parse_word_entry(fake_word_entry(word)))
+            for word in words}
+    main.store.set_many(docs)
+    main.practice_index.build()
+    main.suggest_index.build()
+
+
+def seed_store_from_snapshot(main, path):
+    """Load a snapshot into the store and return the stored English words."""
+    import_snapshot(main.store, path)
+    main.practice_index.build()
+    main.suggest_index.build()
+    return [doc["english_word"] for _, doc in main.store.iter_words(order_by=None, fields=["english_word"])
+            if doc.get("english_word")]
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight)
+    unknown = set(weights) - {"search_hit", "search_miss", "suggest", "practice", "answer", "words",
+                              "practice_session", "answer_batch"}
+    if unknown:
+        raise SystemExit(f"Unknown operations in --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+class Workload:
+    """Generates (endpoint, method, path, json) requests from the operation mix."""
+
+    def __init__(self, mix, seeded_words, unseen_words):
+        self.operations = list(mix)
+        self.weights = [mix[name] for name in self.operations]
+        self.seeded = seeded_words
+        self.unseen = list(unseen_words)
+        self.synthetic = 0
+        self._lock = threading.Lock()
+
+    def next_unseen(self):
+        with self._lock:
+            if self.unseen:
+                return self.unseen.pop()
+            self.synthetic += 1
+            return f"benchmark word {self.synthetic}"
+
+    def next(self, rng):
+        operation = rng.choices(self.operations, self.weights)[0]
+        if operation == "search_hit":
+            return operation, "POST", "/api/search", {"word": rng.choice(self.seeded)}
+        if operation == "search_miss":
+            # exact: misses must reach Gemini instead of being corrected to a seeded word
+            return operation, "POST", "/api/search", {"word": self.next_unseen(), "exact": True}
+        if operation == "suggest":
+            word = rng.choice(self.seeded)
+            return operation, "GET", f"/api/suggest?q={word[:rng.randint(1, 3)]}", None
+        if operation == "practice":
+            return operation, "GET", "/api/practice", None
+        if operation == "answer":
+            return operation, "POST", "/api/answer", {"word": rng.choice(self.seeded), "is_correct": rng.random() < 0.7}
+        if operation == "practice_session":
+            return operation, "GET", "/api/practice/session?n=10", None
+        if operation == "answer_batch":
+            answers = [{"word": rng.choice(self.seeded), "is_correct": rng.random() < 0.7} for _ in range(10)]
+            return operation, "POST", "/api/answer/batch", {"answers": answers}
+        return operation, "GET", f"/api/words?fields={WORD_LIST_FIELDS}", None
+
+
+class Replay:
+    """Replays a JSONL request log in order."""
+
+    def __init__(self, path):
+        self.requests = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if not isinstance(entry, dict) or "path" not in entry:
+                    continue
+                method = entry.get("method", "GET").upper()
+                endpoint = f"{method} {entry['path'].split('?')[0]}"
+                self.requests.append((endpoint, method, entry["path"], entry.get("json", entry.get("body"))))
+        if not self.requests:
+            raise SystemExit(f"No requests found in {path}")
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def next(self, rng):
+        with self._lock:
+            request = self.requests[self._position % len(self.requests)]
+            self._position += 1
+            return request
+
+
+def run(app, source, total, concurrency, seed):
+    """Send `total` requests from `source` with `concurrency` threads. Returns (samples, wall time)."""
+    samples = []  # (endpoint, status, seconds)
+    lock = threading.Lock()
+    remaining = [total]
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(seed + index)
+        results = []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            endpoint, method, path, body = source.next(rng)
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            response.get_data()  # Include streamed bodies
+            results.append((endpoint, response.status_code, time.perf_counter() - started))
+        with lock:
+            samples.extend(results)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, elapsed):
+    by_endpoint = {}
+    for endpoint, status, seconds in samples:
+        by_endpoint.setdefault(endpoint, []).append((status, seconds))
+    report = {}
+    for endpoint, results in sorted(by_endpoint.items()):
+        latencies = [seconds * 1000 for _, seconds in results]
+        report[endpoint] = {
+            "requests": len(results),
+            "errors": sum(1 for status, _ in results if status >= 500),
+            "rps": len(results) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+        }
+    return report
+
+
+def print_report(report, elapsed, total):
+    print(f"\n{'endpoint':<24}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, row in report.items():
+        print(f"{endpoint:<24}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10.1f}"
+              f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+    print(f"\n{total} requests in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} requests/s)")
+
+
+def compare_with_baseline(report, baseline_path, max_regression):
+    """Print p95 regressions against a previous --json-output file. Returns True if any exceeds the limit."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["endpoints"]
+    regressed = False
+    for endpoint, row in report.items():
+        before = baseline.get(endpoint, {}).get("p95_ms")
+        if not before:
+            continue
+        change = (row["p95_ms"] - before) / before
+        if change > max_regression:
+            regressed = True
+            print(f"REGRESSION {endpoint}: p95 {before:.2f}ms -> {row['p95_ms']:.2f}ms ({change:+.0%})")
+    return regressed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the backend against in-memory Firestore and Gemini fakes.")
+    parser.add_argument("--words", default=str(WORDS_FILE), help="Word list used to seed the store (.txt, .csv or .jsonl)")
+    parser.add_argument("--seed-fraction", type=float, default=0.8, help="Fraction of the word list stored before the run")
+    parser.add_argument("--snapshot", help="Seed the store from this snapshot instead (words not in it are unseen)")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="Requests sent before measuring")
+    parser.add_argument("--concurrency", type=int, default=8, help="Worker threads")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--replay", help="JSONL request log to replay instead of the generated mix")
+    parser.add_argument("--firestore-latency-ms", type=float, default=5, help="Simulated latency per Firestore round trip")
+    parser.add_argument("--gemini-latency-ms", type=float, default=300, help="Simulated latency per Gemini call")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0, help="Fraction of Gemini calls that fail")
+    parser.add_argument("--llm-cache", help="LLM response cache file to use (disabled by default)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--json-output", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Earlier --json-output file to compare p95 latencies with")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed p95 increase over the baseline")
+    args = parser.parse_args()
+
+    main, firestore_client, gemini_client = load_app(args)
+    if not main.store:
+        print("Error: word store not initialized.")
+        sys.exit(1)
+
+    words = read_words_from_file(args.words)
+    random.Random(args.seed).shuffle(words)
+    if args.snapshot:
+        seeded = seed_store_from_snapshot(main, args.snapshot)
+        stored = {word.lower() for word in seeded}
+        unseen = [word for word in words if word.lower() not in stored]
+    else:
+        seeded_count = max(1, int(len(words) * args.seed_fraction))
+        seed_store(main, words[:seeded_count])
+        seeded, unseen = words[:seeded_count], words[seeded_count:]
+    if not seeded:
+        print("Error: no words were seeded.")
+        sys.exit(1)
+    print(f"Seeded {len(seeded)} words; {len(unseen)} unseen words for search misses.")
+
+    source = Replay(args.replay) if args.replay else Workload(parse_mix(args.mix), seeded, unseen)
+    if args.warmup:
+        run(main.app, source, args.warmup, args.concurrency, args.seed)
+    round_trips, gemini_calls = firestore_client.round_trips, gemini_client.calls
+
+    samples, elapsed = run(main.app, source, args.requests, args.concurrency, args.seed)
+    report = summarize(samples, elapsed)
+    print_report(report, elapsed, len(samples))
+    print(f"Firestore round trips: {firestore_client.round_trips - round_trips}, "
+          f"Gemini calls: {gemini_client.calls - gemini_calls}")
+
+    if args.json_output:
+        with open(args.json_output, "w", encoding="utf-8") as f:
+            json.dump({"settings": vars(args), "elapsed_seconds": elapsed, "endpoints": report}, f, indent=2)
+        print(f"Report written to {args.json_output}")
+    if args.baseline and compare_with_baseline(report, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,261 @@
+"""
+In-memory stand-ins for the Google services the backend talks to, used by
+scripts/benchmark.py to run the app without network access or credentials.
+
+- `FakeFirestoreClient` implements the part of `google.cloud.firestore.Client`
+  that `FirestoreWordStore` uses (documents, batches, get_all, filtered /
+  ordered / projected / paginated queries, SERVER_TIMESTAMP and Increment
+  transforms).
+- `FakeGeminiClient` answers the word, batched word and distractor prompts of
+  `backend/main.py` like `genai.Client` (including `client.aio`).
+
+Both can add a fixed latency per round trip; the Gemini stub can also fail a
+fraction of calls.
+"""
+
+import re
+import copy
+import json
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from google.api_core import exceptions
+from google.cloud import firestore
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, fields=None):
+        self.id = doc_id
+        self.exists = data is not None
+        if data is not None and fields is not None:
+            data = {key: value for key, value in data.items() if key in fields}
+        self._data = copy.deepcopy(data)
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocumentReference:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self):
+        self._collection.client.round_trip()
+        return self._collection.snapshot(self.id)
+
+    def set(self, data):
+        self._collection.client.round_trip()
+        self._collection.write(self.id, data, merge=False)
+
+    def update(self, fields):
+        self._collection.client.round_trip()
+        self._collection.write(self.id, fields, merge=True)
+
+    def delete(self):
+        self._collection.client.round_trip()
+        self._collection.remove(self.id)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), order=None, fields=None, cursor=None, limit=None):
+        self._collection = collection
+        self._filters = filters  # (field, value) equality filters
+        self._order = order  # (field, descending)
+        self._fields = fields
+        self._cursor = cursor
+        self._limit = limit
+
+    def _copy(self, **changes):
+        state = dict(filters=self._filters, order=self._order, fields=self._fields, cursor=self._cursor,
+                     limit=self._limit)
+        state.update(changes)
+        return FakeQuery(self._collection, **state)
+
+    def where(self, filter):
+        if filter.op_string != '==':
+            raise NotImplementedError(f"Unsupported filter operator {filter.op_string}")
+        return self._copy(filters=self._filters + ((filter.field_path, filter.value),))
+
+    def order_by(self, field, direction=firestore.Query.ASCENDING):
+        return self._copy(order=(field, direction == firestore.Query.DESCENDING))
+
+    def select(self, fields):
+        return self._copy(fields=set(fields))
+
+    def start_after(self, snapshot):
+        return self._copy(cursor=snapshot)
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def _key(self, doc_id, data):
+        return (data[self._order[0]], doc_id) if self._order else (doc_id,)
+
+    def stream(self):
+        self._collection.client.round_trip()
+        with self._collection.lock:
+            docs = list(self._collection.docs.items())
+        docs = [(doc_id, data) for doc_id, data in docs
+                if all(field in data and data[field] == value for field, value in self._filters)]
+        if self._order:
+            # Like Firestore, ordering by a field skips documents without it
+            docs = [(doc_id, data) for doc_id, data in docs if self._order[0] in data]
+        descending = bool(self._order and self._order[1])
+        docs.sort(key=lambda item: self._key(*item), reverse=descending)
+        if self._cursor is not None:
+            cursor = self._key(self._cursor.id, self._collection.docs.get(self._cursor.id, {}))
+            docs = [item for item in docs
+                    if (self._key(*item) < cursor if descending else self._key(*item) > cursor)]
+        if self._limit:
+            docs = docs[:self._limit]
+        for doc_id, data in docs:
+            yield FakeSnapshot(doc_id, data, self._fields)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, name):
+        super().__init__(self)
+        self.client = client
+        self.name = name
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def document(self, doc_id):
+        return FakeDocumentReference(self, doc_id)
+
+    def snapshot(self, doc_id):
+        with self.lock:
+            return FakeSnapshot(doc_id, self.docs.get(doc_id))
+
+    def write(self, doc_id, fields, merge):
+        with self.lock:
+            if merge and doc_id not in self.docs:
+                raise exceptions.NotFound(f"No document to update: {self.name}/{doc_id}")
+            data = dict(self.docs.get(doc_id, {})) if merge else {}
+            for key, value in fields.items():
+                if value is firestore.SERVER_TIMESTAMP:
+                    value = datetime.now(timezone.utc)
+                elif isinstance(value, firestore.Increment):
+                    value = data.get(key, 0) + value.value
+                data[key] = copy.deepcopy(value)
+            self.docs[doc_id] = data
+
+    def remove(self, doc_id):
+        with self.lock:
+            self.docs.pop(doc_id, None)
+
+
+class FakeWriteBatch:
+    def __init__(self, client):
+        self._client = client
+        self._writes = []
+
+    def set(self, ref, data):
+        self._writes.append((ref, data, False))
+
+    def update(self, ref, fields):
+        self._writes.append((ref, fields, True))
+
+    def commit(self):
+        self._client.round_trip()
+        # Batches are atomic: fail before writing anything if an update target is missing
+        for ref, _, merge in self._writes:
+            if merge and not ref._collection.snapshot(ref.id).exists:
+                raise exceptions.NotFound(f"No document to update: {ref.id}")
+        for ref, data, merge in self._writes:
+            ref._collection.write(ref.id, data, merge)
+
+
+class FakeFirestoreClient:
+    """In-memory `firestore.Client` with an optional fixed latency per round trip."""
+
+    def __init__(self, latency_ms=0, **kwargs):
+        self.latency = latency_ms / 1000
+        self.round_trips = 0
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollection(self, name)
+            return self._collections[name]
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def get_all(self, refs):
+        self.round_trip()
+        return [ref._collection.snapshot(ref.id) for ref in refs]
+
+
+class FakeGeminiResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = [type('Candidate', (), {'content': type('Content', (), {'parts': [text]})()})()]
+
+
+class FakeGeminiError(Exception):
+    pass
+
+
+def fake_word_entry(word):
+    return {
+        "most_probable_definition": f"A benchmark definition of the word '{word}', long enough to be usable.",
+        "most_probable_translation": f"{word}-es",
+        "other_definitions": [],
+        "other_translations": [],
+    }
+
+
+class _FakeModels:
+    def __init__(self, client):
+        self._client = client
+
+    def _answer(self, contents):
+        if self._client.random.random() < self._client.failure_rate:
+            raise FakeGeminiError("Simulated Gemini failure")
+        if "JSON array" in contents:
+            words = re.findall(r"^- (.+)$", contents, re.M)
+            return FakeGeminiResponse(json.dumps([dict(fake_word_entry(word), word=word) for word in words]))
+        if "distractor" in contents:
+            return FakeGeminiResponse(f"A made-up distractor definition number {self._client.random.randint(0, 10**6)}.")
+        word = re.search(r"word '(.+?)'", contents).group(1)
+        return FakeGeminiResponse(json.dumps(fake_word_entry(word)))
+
+    def generate_content(self, model, contents, **kwargs):
+        self._client.calls += 1
+        if self._client.latency:
+            time.sleep(self._client.latency)
+        return self._answer(contents)
+
+
+class _FakeAsyncModels(_FakeModels):
+    async def generate_content(self, model, contents, **kwargs):
+        self._client.calls += 1
+        if self._client.latency:
+            await asyncio.sleep(self._client.latency)
+        return self._answer(contents)
+
+
+class FakeGeminiClient:
+    """`genai.Client` stand-in with a fixed latency and a random failure rate."""
+
+    def __init__(self, latency_ms=0, failure_rate=0.0, seed=None, **kwargs):
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.models = _FakeModels(self)
+        self.aio = type('Aio', (), {})()
+        self.aio.models = _FakeAsyncModels(self)
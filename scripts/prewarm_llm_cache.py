@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script to prewarm the persistent LLM response cache (backend/llm_cache.sqlite3).
+
+Words from the input file that are not cached yet for the current Gemini model
+and prompt version are looked up with batched Gemini prompts. With --from-store,
+entries are first copied from word documents already in the store, which costs
+no LLM calls at all. The Dockerfile runs it with scripts/words.txt when the build
+is given the gemini_api_key secret, so the cache file is baked into the image;
+to prewarm a local cache:
+
+    GEMINI_API_KEY=... python scripts/prewarm_llm_cache.py scripts/words.txt
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import main
+from search_words import WORDS_FILE, read_words_from_file
+
+def seed_from_store(include_unversioned):
+    """Copy stored word documents produced by the current model and prompt into the cache."""
+    copied = 0
+    for _, doc in main.store.iter_words(order_by=None):
+        english_word = doc.get("english_word")
+        produced_by_current = (doc.get("llm_model") == main.gemini_model and
+                               doc.get("prompt_version") == main.WORD_PROMPT_VERSION)
+        unversioned = "llm_model" not in doc and "prompt_version" not in doc
+        if not english_word or not (produced_by_current or (include_unversioned and unversioned)):
+            continue
+        if not main.is_usable_definition(doc.get("definition")) or main.cached_word_data(english_word):
+            continue
+        main.remember_word_data(english_word, {
+            "definition": doc.get("definition"),
+            "translation": doc.get("translation"),
+            "other_definitions": doc.get("other_definitions", []),
+            "other_translations": doc.get("other_translations", [])
+        })
+        copied += 1
+    return copied
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Prewarm the persistent Gemini response cache.")
+    parser.add_argument("input_file", nargs="?", default=str(WORDS_FILE), help="Word list (.txt, .csv or .jsonl)")
+    parser.add_argument("--from-store", action="store_true", help="First copy entries from documents in the word store")
+    parser.add_argument("--include-unversioned", action="store_true",
+                        help="With --from-store, also copy documents that predate model/prompt tracking")
+    args = parser.parse_args()
+
+    if main.llm_cache is None:
+        print("Error: the LLM response cache is disabled (LLM_CACHE_PATH is empty).")
+        sys.exit(1)
+    if not main.gemini_model:
+        print("Error: Gemini is not configured (GEMINI_API_KEY is not set).")
+        sys.exit(1)
+
+    if args.from_store:
+        if not main.store:
+            print("Error: word store not initialized.")
+            sys.exit(1)
+        print(f"Copied {seed_from_store(args.include_unversioned)} entries from the word store.")
+
+    words = read_words_from_file(args.input_file)
+    missing = [word for word in words if main.cached_word_data(word) is None]
+    print(f"Found {len(words)} words, {len(words) - len(missing)} already cached.")
+    resolved = main.get_words_data_with_gemini(missing)
+
+    print("\n--- Summary ---")
+    print(f"Looked up with Gemini: {len(resolved)}")
+    print(f"Failed: {len(missing) - len(resolved)}")
+    print(f"Cache entries: {len(main.llm_cache)} ({main.llm_cache.path})")
+
+if __name__ == "__main__":
+    main_cli()
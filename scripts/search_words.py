@@ -1,125 +1,281 @@
 #!/usr/bin/env python3
 """
 Script to search for all words in words.txt file and store them in Firebase.
-This script calls the /api/search endpoint for each word and waits for the response
-before proceeding to the next word.
+This script calls the /api/search endpoint for each word (or /api/search/batch
+with --batch-size) using a pool of worker threads that share one HTTP session.
+
+- Requests are paced by a token-bucket rate limiter (--rate, --burst).
+- Completed words are appended to a checkpoint file, so a crashed or
+  interrupted run resumes where it stopped.
+- Input can be a plain word list (one word per line, // comments), a CSV file
+  (a "word" column, or the first column) or a JSONL file ({"word": ...} or a
+  JSON string per line).
+- A throughput and latency summary is printed at the end.
+
+Usage:
+    python scripts/search_words.py [input_file] [--concurrency 4] [--rate 2]
 """
 
 import os
 import sys
+import csv
+import json
 import time
+import random
+import argparse
+import threading
 import requests
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 
 # Configuration
 WORDS_FILE = Path(__file__).parent / "words.txt"
 API_URL = "http://127.0.0.1:8080/api/search"  # Adjust if your API runs on a different port
-DELAY = 1  # Seconds to wait between requests to avoid overwhelming the API
+CONCURRENCY = 4  # Number of words processed in parallel
+RATE = 2.0  # Requests per second allowed by the rate limiter (replaces the fixed delay between words)
 MAX_RETRIES = 5  # Maximum number of retries for failed requests
 
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter: `rate` tokens per second, up to `burst` at once."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available."""
+        if self.rate <= 0:  # Rate limiting disabled
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class Checkpoint:
+    """Append-only record of the words that were stored successfully."""
+
+    def __init__(self, path):
+        self.path = Path(path) if path else None
+        self.done = set()
+        self.lock = threading.Lock()
+        if self.path and self.path.exists():
+            with open(self.path, 'r') as f:
+                self.done = {line.strip().lower() for line in f if line.strip()}
+
+    def mark(self, words):
+        if not self.path:
+            return
+        with self.lock:
+            with open(self.path, 'a') as f:
+                for word in words:
+                    f.write(word.lower() + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.done.update(word.lower() for word in words)
+
+class Stats:
+    """Collects per-request latencies and outcome counts."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.counts = {"created": 0, "existing": 0, "failed": 0}
+        self.requests = 0
+
+    def record_request(self, latency):
+        with self.lock:
+            self.latencies.append(latency)
+            self.requests += 1
+
+    def record_result(self, status, n=1):
+        with self.lock:
+            self.counts[status] += n
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
 def read_words_from_file(file_path):
-    """Read all words from the specified file."""
+    """Read all words from a .txt, .csv or .jsonl file."""
+    file_path = Path(file_path)
     words = []
     try:
-        with open(file_path, 'r') as f:
-            for line in f:
-                word = line.strip()
-                if word and not word.startswith("//"):  # Skip comments and empty lines
-                    words.append(word)
-        return words
+        with open(file_path, 'r', newline='') as f:
+            if file_path.suffix.lower() == '.csv':
+                rows = list(csv.reader(f))
+                if rows:
+                    header = [cell.strip().lower() for cell in rows[0]]
+                    column = header.index('word') if 'word' in header else 0
+                    if 'word' in header:
+                        rows = rows[1:]
+                    words = [row[column].strip() for row in rows if len(row) > column]
+            elif file_path.suffix.lower() in ('.jsonl', '.ndjson'):
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    words.append((entry.get('word', '') if isinstance(entry, dict) else str(entry)).strip())
+            else:
+                for line in f:
+                    words.append(line.strip())
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         sys.exit(1)
 
-def search_word(word):
-    """Search for a word using the API and store it in Firebase."""
-    retry_count = 0
-    
-    while retry_count <= MAX_RETRIES:
+    # Skip comments, empty lines and duplicates
+    seen = set()
+    unique_words = []
+    for word in words:
+        if word and not word.startswith("//") and word.lower() not in seen:
+            seen.add(word.lower())
+            unique_words.append(word)
+    return unique_words
+
+def post_with_retries(session, limiter, stats, url, payload, label):
+    """POST `payload` with exponential backoff (with jitter). Returns the response or None."""
+    for retry_count in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        started = time.perf_counter()
         try:
-            if retry_count == 0:
-                print(f"Searching for word: {word}")
-            else:
-                print(f"Retrying search for word: {word} (Attempt {retry_count+1}/{MAX_RETRIES+1})")
-                
-            response = requests.post(
-                API_URL,
-                json={"word": word},
-                headers={"Content-Type": "application/json"}
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                print(f"✅ Word '{word}' already exists in database.")
-                return True
-            elif response.status_code == 201:
-                result = response.json()
-                print(f"✅ Word '{word}' successfully added to database.")
-                return True
-            else:
-                print(f"❌ Error searching for word '{word}': {response.status_code} - {response.text}")
-                
-                # If we've reached the maximum number of retries, give up
-                if retry_count >= MAX_RETRIES:
-                    print(f"⚠️ Maximum retries reached for word '{word}'. Moving on...")
-                    return False
-                
-                # Calculate exponential backoff delay: 2^n seconds
-                backoff_delay = 2 ** retry_count
-                print(f"Waiting {backoff_delay} seconds before retrying...")
-                time.sleep(backoff_delay)
-                retry_count += 1
-                
+            response = session.post(url, json=payload, timeout=120)
+            stats.record_request(time.perf_counter() - started)
+            if response.status_code in (200, 201):
+                return response
+            print(f"❌ Error searching for {label}: {response.status_code} - {response.text}")
         except Exception as e:
-            print(f"❌ Exception while searching for word '{word}': {e}")
-            
-            # If we've reached the maximum number of retries, give up
-            if retry_count >= MAX_RETRIES:
-                print(f"⚠️ Maximum retries reached for word '{word}'. Moving on...")
-                return False
-            
-            # Calculate exponential backoff delay: 2^n seconds
-            backoff_delay = 2 ** retry_count
-            print(f"Waiting {backoff_delay} seconds before retrying...")
-            time.sleep(backoff_delay)
-            retry_count += 1
-    
-    return False
+            stats.record_request(time.perf_counter() - started)
+            print(f"❌ Exception while searching for {label}: {e}")
+
+        # If we've reached the maximum number of retries, give up
+        if retry_count >= MAX_RETRIES:
+            print(f"⚠️ Maximum retries reached for {label}. Moving on...")
+            return None
+
+        # Exponential backoff delay (2^n seconds) with jitter
+        backoff_delay = 2 ** retry_count * random.uniform(0.5, 1.5)
+        print(f"Retrying {label} in {backoff_delay:.1f} seconds (Attempt {retry_count+2}/{MAX_RETRIES+1})...")
+        time.sleep(backoff_delay)
+    return None
+
+def search_word(session, limiter, stats, checkpoint, api_url, word):
+    """Search for a word using the API and store it in Firebase."""
+    # exact: a word that looks like a misspelling of a stored one must still be looked up and stored
+    response = post_with_retries(session, limiter, stats, api_url, {"word": word, "exact": True}, f"word '{word}'")
+    if response is None:
+        stats.record_result("failed")
+        return False
+    if response.status_code == 201:
+        print(f"✅ Word '{word}' successfully added to database.")
+        stats.record_result("created")
+    else:
+        print(f"✅ Word '{word}' already exists in database.")
+        stats.record_result("existing")
+    checkpoint.mark([word])
+    return True
+
+def search_words_batch(session, limiter, stats, checkpoint, api_url, words):
+    """Search for a group of words with a single /api/search/batch request."""
+    batch_url = api_url.rstrip('/') + "/batch"
+    response = post_with_retries(session, limiter, stats, batch_url, {"words": words}, f"batch of {len(words)} words")
+    if response is None:
+        stats.record_result("failed", len(words))
+        return False
+    stored = []
+    for result in response.json().get("results", []):
+        stats.record_result(result["status"])
+        if result["status"] == "failed":
+            print(f"❌ Word '{result['word']}' failed: {result.get('error')}")
+        else:
+            stored.append(result["word"])
+    print(f"✅ Batch of {len(words)} words: {len(stored)} stored or already present.")
+    checkpoint.mark(stored)
+    return True
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk-load words through the vocabulary API.")
+    parser.add_argument("input_file", nargs="?", default=str(WORDS_FILE), help="Word list (.txt, .csv or .jsonl)")
+    parser.add_argument("--api-url", default=API_URL, help="URL of the /api/search endpoint")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Number of requests in flight")
+    parser.add_argument("--rate", type=float, default=RATE, help="Maximum requests per second (0 disables the limiter)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed in a burst by the rate limiter")
+    parser.add_argument("--batch-size", type=int, default=0, help="Send this many words per /api/search/batch request (0 = one word per /api/search request)")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default: <input_file>.checkpoint)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore and overwrite an existing checkpoint")
+    return parser.parse_args()
 
 def main():
     """Main function to process all words."""
+    args = parse_args()
+
     # Check if the words file exists
-    if not WORDS_FILE.exists():
-        print(f"Error: Words file not found at {WORDS_FILE}")
+    input_file = Path(args.input_file)
+    if not input_file.exists():
+        print(f"Error: Words file not found at {input_file}")
         sys.exit(1)
-    
-    # Read all words from the file
-    words = read_words_from_file(WORDS_FILE)
-    print(f"Found {len(words)} words to process.")
-    
-    # Process each word
-    success_count = 0
-    failure_count = 0
-    
-    for index, word in enumerate(words):
-        print(f"Processing word {index+1}/{len(words)}: {word}")
-        
-        # Search for the word and store it in Firebase
-        if search_word(word):
-            success_count += 1
-        else:
-            failure_count += 1
-        
-        # Wait before processing the next word
-        if index < len(words) - 1:  # Don't delay after the last word
-            print(f"Waiting {DELAY} seconds before processing next word...")
-            time.sleep(DELAY)
-    
+
+    checkpoint_path = Path(args.checkpoint) if args.checkpoint else input_file.with_name(input_file.name + ".checkpoint")
+    if args.no_resume and checkpoint_path.exists():
+        checkpoint_path.unlink()
+    checkpoint = Checkpoint(checkpoint_path)
+
+    # Read all words from the file, skipping the ones a previous run already stored
+    words = read_words_from_file(input_file)
+    pending = [word for word in words if word.lower() not in checkpoint.done]
+    print(f"Found {len(words)} words, {len(words) - len(pending)} already done according to {checkpoint_path}.")
+    print(f"Processing {len(pending)} words with concurrency={args.concurrency}, rate={args.rate}/s.")
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, args.concurrency))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Content-Type": "application/json"})
+    limiter = TokenBucket(args.rate, args.burst)
+    stats = Stats()
+
+    if args.batch_size > 0:
+        jobs = [pending[i:i + args.batch_size] for i in range(0, len(pending), args.batch_size)]
+        task = lambda group: search_words_batch(session, limiter, stats, checkpoint, args.api_url, group)
+    else:
+        jobs = pending
+        task = lambda word: search_word(session, limiter, stats, checkpoint, args.api_url, word)
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            futures = [executor.submit(task, job) for job in jobs]
+            for index, future in enumerate(as_completed(futures)):
+                future.result()
+                if (index + 1) % 25 == 0:
+                    print(f"--- {index+1}/{len(jobs)} requests completed ---")
+    except KeyboardInterrupt:
+        print("Interrupted; progress has been saved to the checkpoint file.")
+        os._exit(1)
+    elapsed = time.perf_counter() - started
+
     # Print summary
+    processed = sum(stats.counts.values())
     print("\n--- Summary ---")
-    print(f"Total words processed: {len(words)}")
-    print(f"Successful: {success_count}")
-    print(f"Failed: {failure_count}")
+    print(f"Total words processed: {processed}")
+    print(f"Created: {stats.counts['created']}")
+    print(f"Already existing: {stats.counts['existing']}")
+    print(f"Failed: {stats.counts['failed']}")
+    print(f"Elapsed: {elapsed:.1f}s, throughput: {processed / elapsed if elapsed else 0:.2f} words/s")
+    print(f"HTTP requests: {stats.requests}, latency p50={percentile(stats.latencies, 0.5)*1000:.0f}ms "
+          f"p95={percentile(stats.latencies, 0.95)*1000:.0f}ms max={max(stats.latencies, default=0)*1000:.0f}ms")
 
 if __name__ == "__main__":
     main()
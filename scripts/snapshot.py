@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Export the `words` collection to a JSONL snapshot, or import one, without going
+through /api/search (and so without any Gemini calls).
+
+- `export` reads the collection page by page (--page-size documents at a time,
+  continuing after the last id of the previous page), so memory stays bounded
+  however large the collection is. Each line is {"id": ..., "data": {...}};
+  timestamps are written as {"$timestamp": "<ISO 8601>"} so they are restored
+  as timestamps.
+- `import` writes the documents with batched `set_many` calls (one Firestore
+  batch or SQLite transaction per --batch-size documents), several batches in
+  parallel. Existing documents with the same id are overwritten.
+
+Files ending in .gz are gzip-compressed. The store is selected like the app's
+(WORD_STORE, WORD_STORE_PATH, GOOGLE_SERVICE_ACCOUNT_JSON).
+
+Usage:
+    python scripts/snapshot.py export words.jsonl.gz
+    WORD_STORE=sqlite python scripts/snapshot.py import words.jsonl.gz --workers 4
+"""
+
+import sys
+import gzip
+import json
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+PAGE_SIZE = 1000  # Documents read per query when exporting
+BATCH_SIZE = 500  # Documents per set_many call when importing (the Firestore batch limit)
+WORKERS = 4  # Import batches written in parallel
+
+
+def open_snapshot(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return {"$timestamp": value.isoformat()}
+    if isinstance(value, dict):
+        return {key: encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+
+def decode_value(value):
+    if isinstance(value, dict):
+        if len(value) == 1 and "$timestamp" in value:
+            return datetime.fromisoformat(value["$timestamp"])
+        return {key: decode_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+def iter_pages(store, page_size, fields=None):
+    """Yield lists of (word_id, document), `page_size` at a time, in id order."""
+    last_id = None
+    while True:
+        page = list(store.iter_words(order_by=None, limit=page_size, start_after=last_id, fields=fields))
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last_id = page[-1][0]
+
+
+def export_snapshot(store, path, page_size=PAGE_SIZE):
+    """Write every document of `store` to the snapshot at `path`. Returns the number written."""
+    exported = 0
+    with open_snapshot(path, "w") as f:
+        for page in iter_pages(store, page_size):
+            for word_id, doc in page:
+                f.write(json.dumps({"id": word_id, "data": encode_value(doc)}, ensure_ascii=False) + "\n")
+            exported += len(page)
+            print(f"Exported {exported} documents...", end="\r", flush=True)
+    return exported
+
+
+def read_batches(path, batch_size):
+    """Yield {word_id: document} dicts of up to `batch_size` documents from a snapshot."""
+    batch = {}
+    with open_snapshot(path, "r") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not isinstance(entry, dict) or not entry.get("id") or not isinstance(entry.get("data"), dict):
+                raise ValueError(f"{path}:{line_number}: expected an object with 'id' and 'data'")
+            batch[entry["id"]] = decode_value(entry["data"])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = {}
+    if batch:
+        yield batch
+
+
+def import_snapshot(store, path, batch_size=BATCH_SIZE, workers=WORKERS):
+    """Write the documents of the snapshot at `path` to `store`. Returns the number written."""
+    imported = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = {}  # future -> batch size; at most 2 * workers batches are held in memory
+        for batch in read_batches(path, batch_size):
+            if len(pending) >= 2 * max(1, workers):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+                    imported += pending.pop(future)
+                print(f"Imported {imported} documents...", end="\r", flush=True)
+            pending[executor.submit(store.set_many, batch)] = len(batch)
+        for future in list(pending):
+            future.result()
+            imported += pending.pop(future)
+    return imported
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Export or import a snapshot of the words collection.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="Write the words collection to a JSONL snapshot")
+    export_parser.add_argument("path", help="Snapshot file (.jsonl, or .jsonl.gz to compress)")
+    export_parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="Documents read per query")
+    import_parser = commands.add_parser("import", help="Write the documents of a JSONL snapshot to the store")
+    import_parser.add_argument("path", help="Snapshot file (.jsonl or .jsonl.gz)")
+    import_parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Documents per batched write")
+    import_parser.add_argument("--workers", type=int, default=WORKERS, help="Batches written in parallel")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+    import main
+    if not main.store:
+        print("Error: word store not initialized.")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    if args.command == "export":
+        count = export_snapshot(main.store, args.path, args.page_size)
+        action = f"Exported {count} documents to {args.path}"
+    else:
+        count = import_snapshot(main.store, args.path, args.batch_size, args.workers)
+        action = f"Imported {count} documents from {args.path}"
+    elapsed = time.perf_counter() - started
+    print(f"\n{action} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} documents/s)")
+
+
+if __name__ == "__main__":
+    main_cli()